@@ -1,7 +1,9 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from auth.jwt_bearer import JWTBearer
-from config.config import initiate_database
+from config.config import Settings, initiate_database
+from middleware import CompressionMiddleware
 from routes.home import router as home_router
 from routes.alert import router as alert_router
 from routes.charity import router as charity_router
@@ -9,6 +11,10 @@ from routes.user import router as user_router
 from routes.donation import router as donation_router
 from routes.form import router as form_router
 from routes.alert_chat import router as alert_chat_router
+from services.alert_service import alert_refresh_worker
+from services.chat_history import chat_summarizer
+from services.forum_hub import forum_hub
+from services.solana_client import solana_rpc
 
 app = FastAPI(
     title="AidAgent API",
@@ -58,6 +64,8 @@ app = FastAPI(
         "url": "https://opensource.org/licenses/MIT"
     },
     terms_of_service="https://aidagent.com/terms",
+    # orjson encodes the remaining dict responses several times faster than the stdlib encoder
+    default_response_class=ORJSONResponse,
     openapi_tags=[
         {
             "name": "Root",
@@ -108,12 +116,34 @@ app.add_middleware(
 #     allow_headers=["*"],
 # )
 
+settings = Settings()
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        # Token streams must reach the client as generated, SSE responses are skipped by media type too
+        exclude_paths=["/alerts/chat/chat/stream"],
+    )
+
 token_listener = JWTBearer()
 
 
 @app.on_event("startup")
 async def start_database():
     await initiate_database()
+    alert_refresh_worker.start()
+    forum_hub.start()
+    solana_rpc.start()
+
+
+@app.on_event("shutdown")
+async def stop_workers():
+    await alert_refresh_worker.stop()
+    await chat_summarizer.stop()
+    await forum_hub.stop()
+    await solana_rpc.stop()
 
 
 # Include routers
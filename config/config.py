@@ -1,6 +1,7 @@
 from typing import Optional
 
 from beanie import init_beanie
+from beanie.odm.fields import IndexModelField
 from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic_settings import BaseSettings
 import models as models
@@ -15,6 +16,55 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     genai_api_key: Optional[str] = None
 
+    # Gemini
+    llm_model_name: str = "gemini-2.0-flash"
+    llm_max_in_flight: int = 8
+    llm_timeout_seconds: float = 30.0
+
+    # Alert chat
+    chat_cache_max_entries: int = 2048
+    chat_cache_ttl_seconds: int = 900
+    chat_history_token_budget: int = 2000
+    chat_history_max_messages: int = 50
+    chat_summary_max_words: int = 200
+    alert_context_max_entries: int = 1024
+    alert_context_ttl_seconds: int = 300
+    llm_context_cache_enabled: bool = False  # Gemini context caching, needs a model and prompt size that support it
+    llm_context_cache_retry_seconds: int = 600  # Wait this long before retrying an alert whose context failed to cache
+
+    # Pagination
+    default_page_size: int = 50
+    max_page_size: int = 500
+    export_batch_size: int = 500
+
+    # Alerts
+    alert_refresh_ttl_seconds: int = 86400
+    alert_refresh_retry_seconds: int = 300
+    alert_reload_lease_seconds: int = 300
+    alert_refresh_max_locations: int = 1024  # Locations the background sweep keeps refreshing, least recently requested dropped first
+
+    # Read-through cache of documents by id
+    cache_backend: str = "memory"
+    cache_max_entries: int = 10000
+    cache_ttl_seconds: int = 30
+
+    # Solana RPC, point solana_rpc_url at a local test validator or mock server in tests
+    solana_rpc_url: str = "https://api.mainnet-beta.solana.com"
+    solana_rpc_timeout_seconds: float = 10.0
+    solana_rpc_max_retries: int = 3
+    solana_rpc_backoff_seconds: float = 0.5
+    solana_verify_transactions: bool = False
+
+    # Response compression
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1000  # Bytes, smaller bodies gain less than the CPU costs
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4  # Used when the optional brotli package is installed
+
+    # Forums
+    forum_pubsub_backend: str = "local"  # "local" for a single worker, "mongo" to fan out across workers (needs a replica set)
+    forum_subscriber_queue_size: int = 100
+
     class Config:
         env_file = ".env.dev"
         from_attributes = True
@@ -25,3 +75,57 @@ async def initiate_database():
     await init_beanie(
         database=client.get_default_database(), document_models=models.__all__
     )
+    await report_indexes(models.__all__)
+
+
+async def report_indexes(document_models) -> dict:
+    """
+    Compare the indexes declared in each model's Settings with the ones that
+    exist in MongoDB and print whatever is missing or not declared.
+    """
+    report = {}
+    for model in document_models:
+        collection = model.get_motor_collection()
+        declared = model.get_settings().indexes or []
+        existing = [
+            index
+            for index in IndexModelField.from_motor_index_information(
+                await collection.index_information()
+            )
+            if index.name != "_id_"
+        ]
+        missing = [index.name for index in IndexModelField.list_difference(declared, existing)]
+        extra = [index.name for index in IndexModelField.list_difference(existing, declared)]
+        report[collection.name] = {"missing": missing, "extra": extra}
+        if missing:
+            print(f"Indexes missing on {collection.name}: {', '.join(missing)}")
+        if extra:
+            print(f"Undeclared indexes on {collection.name}: {', '.join(extra)}")
+    return report
+
+
+async def find_duplicate_keys(database, document_models) -> dict:
+    """
+    Count the values that occur more than once under each unique index the
+    models declare. initiate_database can't build a unique index while any
+    exist, so run this against the raw database before deploying one and
+    resolve what it prints.
+    """
+    report = {}
+    for model in document_models:
+        collection = database[model.Settings.name]
+        for index in getattr(model.Settings, "indexes", []):
+            document = index.document
+            if not document.get("unique"):
+                continue
+            keys = list(document["key"])
+            pipeline = [
+                {"$match": document.get("partialFilterExpression", {})},
+                {"$group": {"_id": {key.replace(".", "_"): f"${key}" for key in keys}, "count": {"$sum": 1}}},
+                {"$match": {"count": {"$gt": 1}}},
+            ]
+            duplicates = [group["_id"] async for group in collection.aggregate(pipeline)]
+            if duplicates:
+                report[f"{collection.name}.{document['name']}"] = duplicates
+                print(f"Duplicate {', '.join(keys)} on {collection.name}: {len(duplicates)} values, e.g. {duplicates[:5]}")
+    return report
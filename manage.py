@@ -0,0 +1,43 @@
+import asyncio
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient
+import models
+from config.config import Settings, find_duplicate_keys, initiate_database
+from services.alert_chat_service import merge_duplicate_chats
+from services.alert_ingestion import refingerprint_alerts
+from services.donation_service import reverify_pending_donations
+from services.form_service import merge_duplicate_forms, rebuild_forum_participation
+from services.rollup_service import rebuild_rollups
+
+COMMANDS = {
+    "rebuild-rollups": rebuild_rollups,
+    "rebuild-forum-participation": rebuild_forum_participation,
+    "refingerprint-alerts": refingerprint_alerts,
+    "reverify-pending-donations": reverify_pending_donations,
+}
+
+# Commands that repair data initiate_database would fail on, e.g. while building
+# a unique index. They get the raw database instead.
+PRE_INIT_COMMANDS = {
+    "merge-duplicate-forms": merge_duplicate_forms,
+    "merge-duplicate-chats": merge_duplicate_chats,
+    "find-duplicate-keys": lambda database: find_duplicate_keys(database, models.__all__),
+}
+
+
+async def run(command: str):
+    if command in PRE_INIT_COMMANDS:
+        database = AsyncIOMotorClient(Settings().DATABASE_URL).get_default_database()
+        result = await PRE_INIT_COMMANDS[command](database)
+    else:
+        await initiate_database()
+        result = await COMMANDS[command]()
+    print(f"{command}: {result}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in {**COMMANDS, **PRE_INIT_COMMANDS}:
+        print(f"Usage: python manage.py [{'|'.join({**COMMANDS, **PRE_INIT_COMMANDS})}]")
+        sys.exit(1)
+    asyncio.run(run(sys.argv[1]))
@@ -0,0 +1 @@
+from middleware.compression import CompressionMiddleware
@@ -0,0 +1,150 @@
+import zlib
+from typing import Iterable, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional, gzip is always available
+    brotli = None
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = params.strip().replace(" ", "")
+        if quality.startswith("q=") and quality[2:] in ("0", "0.0", "0.00", "0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        # wbits=31 writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Sync flush so every streamed chunk reaches the client right away
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress HTTP responses with brotli (when the package is installed and
+    the client accepts it) or gzip. Bodies smaller than minimum_size, already
+    encoded responses, excluded media types (Server-Sent Events, which must
+    not be buffered) and excluded path prefixes are sent as they are.
+    Streamed bodies are compressed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        exclude_paths: Iterable[str] = (),
+        exclude_media_types: Iterable[str] = ("text/event-stream",),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_paths = tuple(exclude_paths)
+        self.exclude_media_types = tuple(exclude_media_types)
+
+    def _choose_encoding(self, scope: Scope) -> Optional[str]:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self._middleware = middleware
+        self._encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._compressor = None
+        self._passthrough = False
+
+    def _new_compressor(self):
+        if self._encoding == "br":
+            return _BrotliCompressor(self._middleware.brotli_quality)
+        return _GzipCompressor(self._middleware.gzip_level)
+
+    def _skip(self, headers: Headers) -> bool:
+        if self._start["status"] < 200 or self._start["status"] in (204, 304):
+            return True
+        if "content-encoding" in headers:
+            return True
+        media_type = headers.get("content-type", "").split(";")[0].strip()
+        return media_type in self._middleware.exclude_media_types
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held until the first body chunk shows whether to compress
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+        if self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._compressor is None:
+            headers = MutableHeaders(raw=self._start["headers"])
+            small = not more_body and len(body) < self._middleware.minimum_size
+            if self._skip(headers) or small:
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send(message)
+                return
+            headers["Content-Encoding"] = self._encoding
+            headers.add_vary_header("Accept-Encoding")
+            self._compressor = self._new_compressor()
+            if not more_body:
+                body = self._compressor.finish(body)
+                headers["Content-Length"] = str(len(body))
+                await self._send(self._start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            del headers["Content-Length"]
+            await self._send(self._start)
+
+        body = self._compressor.finish(body) if not more_body else self._compressor.chunk(body)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -1,9 +1,10 @@
 from models.alert import Alert, MetaInfo
 from models.user import User
 from models.charity import Charity
-from models.donation import Donation
-from models.form import Form
-from models.alert_chat import AlertChat
+from models.donation import Donation, DonationRollup
+from models.form import Form, ForumEvent, ForumParticipation
+from models.alert_chat import AlertChat, AlertChatMessage
+from models.lease import Lease
 
 
-__all__ = [Alert, User, MetaInfo, Charity, Donation, Form, AlertChat]
\ No newline at end of file
+__all__ = [Alert, User, MetaInfo, Charity, Donation, Form, AlertChat, AlertChatMessage, Lease, DonationRollup, ForumEvent, ForumParticipation]
\ No newline at end of file
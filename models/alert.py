@@ -1,13 +1,30 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 from beanie import Document
 from pydantic import BaseModel, Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 class MetaInfo(Document):
+    location: str = Field(..., example="Berlin")
     last_loaded: Optional[datetime] = Field(default=None, example="2025-06-14T18:00:00Z")
+    last_attempted: Optional[datetime] = None
+    ttl_seconds: Optional[int] = None  # Overrides the default refresh interval for this location
+    status: str = "idle"  # idle, loading, loaded, failed
+    last_error: Optional[str] = None
 
     class Settings:
         name = "meta_info"
+        indexes = [IndexModel([("location", ASCENDING)], unique=True)]
+
+    def is_stale(self, default_ttl: timedelta, retry_after: timedelta) -> bool:
+        now = datetime.utcnow()
+        ttl = timedelta(seconds=self.ttl_seconds) if self.ttl_seconds else default_ttl
+        if self.last_loaded and self.last_loaded >= now - ttl:
+            return False
+        # Don't hammer Gemini for a location whose last attempt just failed
+        if self.last_attempted and self.last_attempted >= now - retry_after:
+            return False
+        return True
 
 class Alert(Document):
     alert_id: str
@@ -21,6 +38,17 @@ class Alert(Document):
     missing_persons_reported: Optional[str] = None
     source: Optional[str] = "Unknown"
     details: Optional[List[str]] = Field(default_factory=list)
+    fingerprint: Optional[str] = None  # Set on alerts ingested from Gemini, see services/alert_ingestion
+    version: int = 0  # Incremented on every update, clients revalidate against it through ETags
 
     class Settings:
-        name = "alerts"
\ No newline at end of file
+        name = "alerts"
+        indexes = [
+            IndexModel([("alert_id", ASCENDING)], unique=True),
+            IndexModel([("location", ASCENDING), ("timestamp", DESCENDING)]),
+            IndexModel(
+                [("fingerprint", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"fingerprint": {"$type": "string"}},
+            ),
+        ]
\ No newline at end of file
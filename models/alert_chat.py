@@ -1,6 +1,8 @@
 from beanie import Document
 from pydantic import BaseModel, Field
-from typing import List
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from typing import List, Optional
 from datetime import datetime
 
 class ChatMessage(BaseModel):
@@ -8,17 +10,109 @@ class ChatMessage(BaseModel):
     message: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+
+class AlertChatMessage(Document):
+    alert_id: str
+    user_id: str
+    seq: int  # Position in the conversation, legacy messages have seq <= 0
+    role: str  # "user" or "ai"
+    content: str
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "chat_messages"
+        indexes = [
+            IndexModel(
+                [("alert_id", ASCENDING), ("user_id", ASCENDING), ("seq", ASCENDING)],
+                unique=True,
+            ),
+        ]
+
+
 class AlertChat(Document):
     alert_id: str  # <- Must be here as a class attribute
     user_id: str  # User ID of the person who created the chat
-    messages: List[dict] = Field(default_factory=list)
+    messages: List[dict] = Field(default_factory=list)  # Legacy embedded history, moved to chat_messages on access
+    message_count: int = 0  # Last seq handed out in chat_messages
+    summary: Optional[str] = None  # Rolling summary of the messages that no longer fit the prompt
+    summary_through_seq: Optional[int] = None  # Seq of the last message folded into summary
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "alert_chats"
+        indexes = [
+            IndexModel([("alert_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+        ]
+
+    @classmethod
+    async def append_message(
+        cls, alert_id: str, user_id: str, role: str, content: str
+    ) -> AlertChatMessage:
+        """
+        Append one message to a conversation, creating the chat if needed.
+        Costs one atomic $inc to reserve the next seq and one insert, however
+        long the conversation already is.
+        """
+        now = datetime.utcnow()
+        update = {
+            "$inc": {"message_count": 1},
+            "$set": {"updated_at": now},
+            "$setOnInsert": {"created_at": now, "messages": []},
+        }
+        projection = {"message_count": 1, "messages": {"$slice": 1}}
+        collection = cls.get_motor_collection()
+        try:
+            chat = await collection.find_one_and_update(
+                {"alert_id": alert_id, "user_id": user_id}, update,
+                projection=projection, upsert=True, return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Lost the race to create the chat, it exists now
+            chat = await collection.find_one_and_update(
+                {"alert_id": alert_id, "user_id": user_id}, update,
+                projection=projection, return_document=ReturnDocument.AFTER,
+            )
+        if chat.get("messages"):
+            await cls.migrate_embedded_messages(chat["_id"])
+
+        message = AlertChatMessage(
+            alert_id=alert_id, user_id=user_id, seq=chat["message_count"],
+            role=role, content=content, timestamp=now,
+        )
+        await message.insert()
+        return message
+
+    @classmethod
+    async def migrate_embedded_messages(cls, chat_id) -> None:
+        """
+        Move a chat's legacy embedded messages into chat_messages with seq
+        -(n-1)..0 so they sort before every appended message. Safe to run
+        concurrently or again after a crash: the unique seq index rejects
+        copies that already exist.
+        """
+        chat = await cls.get_motor_collection().find_one({"_id": chat_id})
+        legacy = chat.get("messages") if chat else None
+        if not legacy:
+            return
+        offset = len(legacy) - 1
+        documents = [
+            AlertChatMessage(
+                alert_id=chat["alert_id"],
+                user_id=chat["user_id"],
+                seq=index - offset,
+                role=message.get("role") or message.get("sender") or "user",
+                content=message.get("content") or message.get("message") or "",
+                timestamp=message.get("timestamp") or chat.get("created_at") or datetime.utcnow(),
+            ).model_dump(exclude={"id", "revision_id"})
+            for index, message in enumerate(legacy)
+        ]
+        try:
+            await AlertChatMessage.get_motor_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+        await cls.get_motor_collection().update_one({"_id": chat_id}, {"$set": {"messages": []}})
 
-    async def add_message(self, sender: str, message: str):
-        self.messages.append(ChatMessage(sender=sender, message=message))
-        self.updated_at = datetime.utcnow()
-        await self.save()
+    async def add_message(self, sender: str, message: str) -> AlertChatMessage:
+        return await AlertChat.append_message(self.alert_id, self.user_id, sender, message)
@@ -1,6 +1,7 @@
 from beanie import Document
 from pydantic import Field
 from typing import Optional
+from pymongo import ASCENDING, IndexModel
 
 
 class Charity(Document):
@@ -11,6 +12,8 @@ class Charity(Document):
     website: Optional[str]
     alert_id: str  # Link to related alert
     wallet_address: str  # Solana wallet address for donations
+    version: int = 0  # Incremented on every update, clients revalidate against it through ETags
 
     class Settings:
         name = "charities"
+        indexes = [IndexModel([("alert_id", ASCENDING)])]
@@ -2,6 +2,7 @@ from beanie import Document
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional 
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 class Donation(Document):
     donor_wallet: str  # Solana wallet address
@@ -14,4 +15,28 @@ class Donation(Document):
     user_id: Optional[str] = None  # User ID of the donor
     message: Optional[str] = None  # Optional message from the donor    
     class Settings:
-        name = "donations"
\ No newline at end of file
+        name = "donations"
+        indexes = [
+            IndexModel([("tx_signature", ASCENDING)], unique=True),
+            IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)]),
+            IndexModel([("charity_id", ASCENDING)]),
+        ]
+
+
+class DonationRollup(Document):
+    dimension: str  # charity, alert, currency or day
+    key: str  # charity_id, alert_id, currency or YYYY-MM-DD
+    currency: str
+    total_amount: float = 0
+    donation_count: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "donation_rollups"
+        indexes = [
+            IndexModel(
+                [("dimension", ASCENDING), ("key", ASCENDING), ("currency", ASCENDING)],
+                unique=True,
+            ),
+            IndexModel([("dimension", ASCENDING), ("total_amount", DESCENDING)]),
+        ]
\ No newline at end of file
@@ -2,6 +2,8 @@ from beanie import Document
 from pydantic import BaseModel, Field
 from typing import List
 from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
 
 
 class Message(BaseModel):
@@ -15,11 +17,82 @@ class Form(Document):
     messages: List[Message] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = 0  # Incremented with every message, clients revalidate against it through ETags
 
     class Settings:
         name = "forms"
+        indexes = [
+            # One form per alert, posting relies on it to upsert safely
+            IndexModel([("alert_id", ASCENDING)], unique=True, name="alert_id_unique"),
+        ]
 
-    async def add_message(self, message: Message):
-        self.messages.append(message)
-        self.updated_at = datetime.utcnow()
-        await self.save()
+    @classmethod
+    async def append_message(cls, alert_id: str, message: Message) -> Message:
+        """
+        Append a message to an alert's form, creating the form if needed, in a
+        single atomic update that never reads or rewrites the other messages.
+        """
+        update = {
+            "$push": {"messages": message.model_dump()},
+            "$set": {"updated_at": message.timestamp},
+            "$inc": {"version": 1},
+            "$setOnInsert": {"created_at": message.timestamp},
+        }
+        collection = cls.get_motor_collection()
+        try:
+            await collection.update_one({"alert_id": alert_id}, update, upsert=True)
+        except DuplicateKeyError:
+            # Lost the race to create the form, it exists now
+            await collection.update_one({"alert_id": alert_id}, update)
+        return message
+
+
+class ForumEvent(Document):
+    """
+    A message posted to a forum, written so that every API worker watching
+    this collection's change stream can push it to its own WebSocket clients.
+    Expires on its own, it is not the record of the message.
+    """
+    alert_id: str
+    message: dict
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "forum_events"
+        indexes = [
+            IndexModel([("created_at", ASCENDING)], expireAfterSeconds=3600),
+        ]
+
+
+class ForumParticipation(Document):
+    """
+    One row per user and forum they posted in, maintained on every post so
+    a user's active forums come from one indexed query.
+    """
+    user_id: str
+    alert_id: str
+    first_posted_at: datetime
+    last_posted_at: datetime
+    message_count: int = 0
+
+    class Settings:
+        name = "forum_participants"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("alert_id", ASCENDING)], unique=True),
+            IndexModel([("user_id", ASCENDING), ("last_posted_at", DESCENDING)]),
+        ]
+
+    @classmethod
+    async def record_post(cls, alert_id: str, message: Message) -> None:
+        update = {
+            "$inc": {"message_count": 1},
+            "$min": {"first_posted_at": message.timestamp},
+            "$max": {"last_posted_at": message.timestamp},
+        }
+        collection = cls.get_motor_collection()
+        key = {"user_id": message.user_id, "alert_id": alert_id}
+        try:
+            await collection.update_one(key, update, upsert=True)
+        except DuplicateKeyError:
+            # Lost the race to create the row, it exists now
+            await collection.update_one(key, update)
@@ -0,0 +1,13 @@
+from datetime import datetime
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+
+
+class Lease(Document):
+    key: str  # Name of the resource being held, e.g. "alerts:Berlin"
+    owner: str  # Random token of the holder, only the owner can release
+    expires_at: datetime
+
+    class Settings:
+        name = "leases"
+        indexes = [IndexModel([("key", ASCENDING)], unique=True)]
@@ -3,6 +3,7 @@ from datetime import datetime
 from beanie import Document
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Dict
+from pymongo import ASCENDING, IndexModel
 from solana.rpc.api import Pubkey
 
 class User(Document):
@@ -13,6 +14,7 @@ class User(Document):
     location: Optional[str] = None  # Could be GPS coordinates or text
     class Settings:
         name = "users"
+        indexes = [IndexModel([("wallet_address", ASCENDING)], unique=True)]
 
     # @field_validator("wallet_address")
     # def validate_solana_address(cls, v):
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Body, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, Body, HTTPException, Request
+from fastapi import Response as HTTPResponse
+from fastapi.responses import StreamingResponse
 from typing import List
+from pymongo.errors import DuplicateKeyError
 from models.alert import Alert
-from schemas.alert import Response, Alert as AlertSchema, UpdateAlertModel
+from schemas.alert import AlertPage, Response, Alert as AlertSchema, UpdateAlertModel
 from services.alert_service import (
     add_alert,
     retrieve_alerts,
@@ -10,37 +14,84 @@ from services.alert_service import (
     delete_alert,
     update_alert_if_stale,
 )
+from services.http_cache import NO_CACHE, conditional, items_etag, version_etag
+from services.responses import ModelResponse
+from services.export_service import (
+    ALERT_EXPORT_FIELDS,
+    build_export_filter,
+    export_media_type,
+    stream_export,
+)
 
 router = APIRouter()
 
 
 @router.get(
     "/", 
-    response_model=Response,
-    description="Retrieve emergency alerts with optional location-based filtering and refresh capabilities. Supports location parameter for geographically relevant alerts and refresh parameter to force data reload from external sources. Returns comprehensive alert data including alert_id, message content, location coordinates, timestamps, metadata, available aid information, missing persons reports, and source attribution. Essential for emergency response coordination and situational awareness."
+    response_model=AlertPage,
+    response_class=ModelResponse,
+    description="Retrieve emergency alerts with optional location-based filtering and refresh capabilities. Supports location parameter for geographically relevant alerts and refresh parameter to force data reload from external sources. Returns comprehensive alert data including alert_id, message content, location coordinates, timestamps, metadata, available aid information, missing persons reports, and source attribution. Results are paginated newest first: pass limit and the returned next_cursor as after to fetch the next page, and fields (comma separated) to return only selected fields. Responses carry an ETag: send it back as If-None-Match to get a 304 when the page has not changed. Essential for emergency response coordination and situational awareness."
 )
 async def get_alerts(
-    location: str = None, refresh: bool = False
+    request: Request, response: HTTPResponse,
+    location: str = None, refresh: bool = False,
+    limit: int = None, after: str = None, fields: str = None,
 ):
-    alerts = await retrieve_alerts(
-        location=location, refresh=refresh
+    try:
+        alerts, next_cursor = await retrieve_alerts(
+            location=location, refresh=refresh, limit=limit, after=after, fields=fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    not_modified = conditional(request, response, items_etag(alerts, next_cursor), cache_control=NO_CACHE)
+    if not_modified:
+        return not_modified
+    page = AlertPage(
+        status_code=200,
+        response_type="success",
+        description="Alerts retrieved successfully",
+        data=alerts,
+        next_cursor=next_cursor,
+    )
+    return ModelResponse(page, headers=dict(response.headers))
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    description="Stream stored emergency alerts for reporting as NDJSON (format=ndjson, default) or CSV (format=csv). Optional location filters by the alert location and start and end (ISO datetimes, end exclusive) restrict the alert timestamp range. Nested details and aid_available values are JSON encoded in CSV cells. Records are read from MongoDB in bounded batches, so exports of any size use constant memory. Never triggers a reload from external sources."
+)
+async def export_alerts(
+    format: str = "ndjson",
+    location: str = None,
+    start: datetime = None,
+    end: datetime = None,
+):
+    try:
+        media_type = export_media_type(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filters = build_export_filter(start=start, end=end, location=location)
+    return StreamingResponse(
+        stream_export(Alert, filters, ALERT_EXPORT_FIELDS, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=alerts.{format}"},
     )
-    return {
-        "status_code": 200,
-        "response_type": "success",
-        "description": "Alerts retrieved successfully",
-        "data": alerts,
-    }
 
 
 @router.get(
     "/{alert_id}", 
     response_model=Response,
-    description="Retrieve detailed information for a specific emergency alert by its unique alert_id. Returns complete alert profile including message content, geographical location, related request identifiers, creation timestamp, metadata, available aid resources, missing persons information, source attribution, and additional contextual details. Critical for emergency response teams, aid coordination, and detailed incident analysis."
+    description="Retrieve detailed information for a specific emergency alert by its unique alert_id. Returns complete alert profile including message content, geographical location, related request identifiers, creation timestamp, metadata, available aid resources, missing persons information, source attribution, and additional contextual details. Supports If-None-Match with the returned ETag, which changes whenever the alert is updated. Critical for emergency response teams, aid coordination, and detailed incident analysis."
 )
-async def get_alert(alert_id: str):
+async def get_alert(alert_id: str, request: Request, response: HTTPResponse):
     alert = await retrieve_alert(alert_id)
     if alert:
+        not_modified = conditional(
+            request, response, version_etag(str(alert.id), alert.version), cache_control=NO_CACHE
+        )
+        if not_modified:
+            return not_modified
         return {
             "status_code": 200,
             "response_type": "success",
@@ -56,7 +107,10 @@ async def get_alert(alert_id: str):
     description="Create a new emergency alert in the AidAgent system. Requires alert_id and message as mandatory fields. Supports optional location (city, country format), related_request_id for linking to external systems, metadata for additional context, aid_available array for resource information, missing_persons_reported for casualty data, source attribution, and details array for comprehensive incident information. Automatically timestamps with UTC datetime. Returns 201 status with created alert data."
 )
 async def create_alert(alert: Alert = Body(...)):
-    new_alert = await add_alert(alert)
+    try:
+        new_alert = await add_alert(alert)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="An alert with this alert_id already exists")
     return {
         "status_code": 201,
         "response_type": "success",
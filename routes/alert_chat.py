@@ -1,7 +1,17 @@
-from fastapi import APIRouter, Body, HTTPException
+import json
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from models.alert_chat import AlertChat
-from services.alert_chat_service import chat_about_alert
+from services.alert_chat_service import (
+    chat_about_alert,
+    get_alert_chat,
+    get_chat_messages,
+    latest_chat_seq,
+    stream_chat_about_alert,
+)
+from services.http_cache import conditional, version_etag
 
 router = APIRouter()
 
@@ -13,24 +23,103 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     reply: str
 
+class ChatHistoryMessage(BaseModel):
+    seq: int
+    role: str
+    content: str
+    timestamp: datetime
+
+class ChatHistoryResponse(BaseModel):
+    alert_id: str
+    user_id: str
+    created_at: datetime
+    updated_at: datetime
+    messages: List[ChatHistoryMessage]
+    has_more: bool  # More messages lie beyond this page in the direction requested
+    last_seq: Optional[int] = None  # Newest seq of the conversation, pass as `after` to poll for new messages
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
-    reply = await chat_about_alert(request.alert_id, request.message, request.user_id)
+    try:
+        reply = await chat_about_alert(request.alert_id, request.message, request.user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     if not reply:
         raise HTTPException(status_code=500, detail="AI response error")
     return ChatResponse(reply=reply)
 
-@router.get("/chat/{alert_id}", response_model=AlertChat)
-async def get_chat_history(alert_id: str, user_id: str):
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat/stream", response_class=StreamingResponse)
+async def chat_stream(request: ChatRequest):
     """
-    Retrieve chat history for a specific alert and user.
-    Returns the AlertChat document containing all messages.
+    Streaming variant of /chat. Sends the reply as Server-Sent Events while
+    Gemini generates it: one `token` event per chunk ({"text": ...}), then a
+    final `done` event, or an `error` event if generation fails.
     """
-    chat_history = await AlertChat.find_one(
-        AlertChat.alert_id == alert_id, AlertChat.user_id == user_id
+    try:
+        chunks = await stream_chat_about_alert(request.alert_id, request.message, request.user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    async def events():
+        try:
+            async for text in chunks:
+                yield _sse("token", {"text": text})
+        except Exception as e:
+            print(f"Error streaming from Gemini: {e}")
+            yield _sse("error", {"detail": "AI response error"})
+            return
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    
+
+@router.get("/chat/{alert_id}", response_model=ChatHistoryResponse)
+async def get_chat_history(
+    alert_id: str,
+    user_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of messages to return"),
+    before: Optional[int] = Query(None, description="Only messages with a lower seq, to page back through older messages"),
+    after: Optional[int] = Query(None, description="Only messages with a higher seq, to fetch what is new"),
+    since: Optional[datetime] = Query(None, description="Only messages sent after this time"),
+):
+    """
+    Retrieve chat history for a specific alert and user, one page at a time.
+    Without cursors the newest messages are returned. The ETag covers the
+    page parameters and changes whenever a message is added, so a polling
+    client sending If-None-Match gets a 304 until there is something new.
+    """
+    chat_history = await get_alert_chat(alert_id, user_id)
+
     if not chat_history:
         raise HTTPException(status_code=404, detail="Chat history not found")
-    
-    return chat_history
+
+    last_seq = await latest_chat_seq(alert_id, user_id)
+    not_modified = conditional(
+        request,
+        response,
+        version_etag(str(chat_history.id), last_seq, limit, before, after, since),
+        cache_control="private, no-cache",
+    )
+    if not_modified:
+        return not_modified
+
+    messages, has_more = await get_chat_messages(alert_id, user_id, limit, before, after, since)
+    return ChatHistoryResponse(
+        alert_id=chat_history.alert_id,
+        user_id=chat_history.user_id,
+        created_at=chat_history.created_at,
+        updated_at=chat_history.updated_at,
+        messages=[ChatHistoryMessage.model_validate(message, from_attributes=True) for message in messages],
+        has_more=has_more,
+        last_seq=last_seq,
+    )
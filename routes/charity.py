@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, HTTPException, Request
+from fastapi import Response as HTTPResponse
 from typing import List
 from beanie import PydanticObjectId
 from models.charity import Charity
@@ -11,22 +12,38 @@ from services.charity_service import (
     update_charity,
     delete_charity,
 )
+from services.http_cache import conditional, items_etag, version_etag
 
 router = APIRouter()
 
+# Charity records change rarely, a minute of client-side reuse is acceptable
+CHARITY_CACHE_CONTROL = "public, max-age=60"
+
 
 @router.get(
     "/", 
     response_model=Response,
-    description="Retrieve a comprehensive list of all registered charitable organizations in the AidAgent platform. Returns complete charity profiles including charity_id, organization name, description, geographical location, contact information, website URLs, and associated alert_id linkages. Essential for donors seeking verified charitable organizations, aid coordination efforts, and maintaining a centralized registry of humanitarian organizations. Supports administrative oversight and charity verification processes."
+    description="Retrieve a comprehensive list of all registered charitable organizations in the AidAgent platform. Returns complete charity profiles including charity_id, organization name, description, geographical location, contact information, website URLs, and associated alert_id linkages. Essential for donors seeking verified charitable organizations, aid coordination efforts, and maintaining a centralized registry of humanitarian organizations. Supports administrative oversight and charity verification processes. Paginated with limit and after (the next_cursor of the previous page), and fields (comma separated) to return only selected fields."
 )
-async def get_charities():
-    charities = await retrieve_charities()
+async def get_charities(
+    request: Request, response: HTTPResponse,
+    limit: int = None, after: str = None, fields: str = None,
+):
+    try:
+        charities, next_cursor = await retrieve_charities(limit=limit, after=after, fields=fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    not_modified = conditional(
+        request, response, items_etag(charities, next_cursor), cache_control=CHARITY_CACHE_CONTROL
+    )
+    if not_modified:
+        return not_modified
     return {
         "status_code": 200,
         "response_type": "success",
         "description": "Charities retrieved successfully",
         "data": charities,
+        "next_cursor": next_cursor,
     }
 
 
@@ -35,13 +52,27 @@ async def get_charities():
     response_model=Response,
     description="Retrieve all charitable organizations specifically associated with a particular emergency alert by alert_id. This endpoint enables targeted charity discovery based on emergency context, allowing donors to find organizations actively responding to specific disasters or crises. Returns filtered charity list with complete organizational details including contact information, location data, and operational focus. Critical for emergency-specific donation routing and coordinated humanitarian response efforts."
 )
-async def get_charities_by_alert(alert_id: str):
-    charities = await retrieve_charities_by_alert(alert_id)
+async def get_charities_by_alert(
+    alert_id: str, request: Request, response: HTTPResponse,
+    limit: int = None, after: str = None, fields: str = None,
+):
+    try:
+        charities, next_cursor = await retrieve_charities_by_alert(
+            alert_id, limit=limit, after=after, fields=fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    not_modified = conditional(
+        request, response, items_etag(charities, next_cursor), cache_control=CHARITY_CACHE_CONTROL
+    )
+    if not_modified:
+        return not_modified
     return {
         "status_code": 200,
         "response_type": "success",
         "description": f"Charities related to alert {alert_id} retrieved successfully",
         "data": charities,
+        "next_cursor": next_cursor,
     }
 
 
@@ -50,9 +81,15 @@ async def get_charities_by_alert(alert_id: str):
     response_model=Response,
     description="Retrieve detailed information for a specific charitable organization by its unique MongoDB ObjectId. Returns comprehensive charity profile including charity_id, organization name, mission description, operational location, contact details, official website, and linked emergency alert context. Essential for due diligence processes, donor verification, detailed charity research, and integration with external charity rating systems. Returns 404 if charity not found."
 )
-async def get_charity(id: PydanticObjectId):
+async def get_charity(id: PydanticObjectId, request: Request, response: HTTPResponse):
     charity = await retrieve_charity(id)
     if charity:
+        not_modified = conditional(
+            request, response, version_etag(str(charity.id), charity.version),
+            cache_control=CHARITY_CACHE_CONTROL,
+        )
+        if not_modified:
+            return not_modified
         return {
             "status_code": 200,
             "response_type": "success",
@@ -1,8 +1,11 @@
+from datetime import datetime
 from fastapi import APIRouter, Body, HTTPException
+from fastapi.responses import StreamingResponse
 from beanie import PydanticObjectId
 from typing import List
+from pymongo.errors import DuplicateKeyError
 from models.donation import Donation
-from schemas.donation import Response, DonationModel, UpdateDonationModel
+from schemas.donation import DonationPage, Response, DonationModel, UpdateDonationModel
 from services.donation_service import (
     add_donation,
     retrieve_donations,
@@ -12,22 +15,76 @@ from services.donation_service import (
     retrieve_donations_history,
     retrieve_donations_done_by_user
 )
+from services.responses import ModelResponse
+from services.rollup_service import retrieve_rollups
+from services.export_service import (
+    DONATION_EXPORT_FIELDS,
+    build_export_filter,
+    export_media_type,
+    stream_export,
+)
 
 router = APIRouter()
 
 
 @router.get(
     "/", 
+    response_model=DonationPage,
+    response_class=ModelResponse,
+    description="Retrieve a comprehensive list of all cryptocurrency donations made through the AidAgent platform. Returns complete donation records including donor wallet addresses, donation amounts, currency types (ETH, BTC, USDC, etc.), transaction timestamps, and associated charity identifiers. Essential for financial transparency, donation tracking, audit trails, and generating donation reports. Supports administrative oversight, tax reporting, and donor recognition programs. Paginated with limit and after (the next_cursor of the previous page), and fields (comma separated) to return only selected fields."
+)
+async def get_donations(limit: int = None, after: str = None, fields: str = None):
+    try:
+        donations, next_cursor = await retrieve_donations(limit=limit, after=after, fields=fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ModelResponse(DonationPage(
+        status_code=200,
+        response_type="success",
+        description="Donations retrieved successfully",
+        data=donations,
+        next_cursor=next_cursor,
+    ))
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    description="Stream donation records for reporting as NDJSON (format=ndjson, default) or CSV (format=csv). Optional start and end (ISO datetimes, end exclusive) restrict the donation timestamp range and status filters by donation status. Records are read from MongoDB in bounded batches and written to the response as they arrive, so exports of any size use constant memory."
+)
+async def export_donations(
+    format: str = "ndjson",
+    start: datetime = None,
+    end: datetime = None,
+    status: str = None,
+):
+    try:
+        media_type = export_media_type(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filters = build_export_filter(start=start, end=end, status=status)
+    return StreamingResponse(
+        stream_export(Donation, filters, DONATION_EXPORT_FIELDS, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=donations.{format}"},
+    )
+
+
+@router.get(
+    "/rollups/{dimension}",
     response_model=Response,
-    description="Retrieve a comprehensive list of all cryptocurrency donations made through the AidAgent platform. Returns complete donation records including donor wallet addresses, donation amounts, currency types (ETH, BTC, USDC, etc.), transaction timestamps, and associated charity identifiers. Essential for financial transparency, donation tracking, audit trails, and generating donation reports. Supports administrative oversight, tax reporting, and donor recognition programs."
+    description="Retrieve precomputed donation rollups for dashboards. dimension is one of charity (top charities by amount raised), alert (funding per emergency alert via the charity's alert_id), currency (totals per currency) or day (daily totals, most recent day first). Each row holds key, currency, total_amount and donation_count and is maintained incrementally as donations are created, updated and deleted, so the cost depends on the number of charities or days rather than the number of donations. Optional currency filter and limit (default 10)."
 )
-async def get_donations():
-    donations = await retrieve_donations()
+async def get_donation_rollups(dimension: str, currency: str = None, limit: int = 10):
+    try:
+        rollups = await retrieve_rollups(dimension, currency=currency, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
         "status_code": 200,
         "response_type": "success",
-        "description": "Donations retrieved successfully",
-        "data": donations,
+        "description": f"Donation rollups by {dimension} retrieved successfully",
+        "data": rollups,
     }
 
 
@@ -51,10 +108,16 @@ async def get_donation(id: PydanticObjectId):
 @router.post(
     "/transaction", 
     response_model=Response,
-    description="Record a new cryptocurrency donation transaction in the AidAgent platform. Requires donor_wallet (blockchain address), amount (numeric value), currency (ETH, BTC, USDC, etc.), and charity_id as mandatory fields. Automatically timestamps the donation with UTC datetime for accurate record-keeping. Essential for tracking blockchain-based charitable contributions, maintaining donation transparency, and linking contributions to specific charitable organizations. Returns 201 status with created donation record."
+    description="Record a new cryptocurrency donation transaction in the AidAgent platform. Requires donor_wallet (blockchain address), amount (numeric value), currency (ETH, BTC, USDC, etc.), and charity_id as mandatory fields. Automatically timestamps the donation with UTC datetime for accurate record-keeping. When transaction verification is enabled the tx_signature is checked on Solana first: unknown or failed transactions are rejected with 400, and the donation is kept as pending if the RPC endpoint cannot be reached. Essential for tracking blockchain-based charitable contributions, maintaining donation transparency, and linking contributions to specific charitable organizations. Returns 201 status with created donation record."
 )
 async def create_donation(donation: Donation = Body(...)):
-    new_donation = await add_donation(donation)
+    try:
+        new_donation = await add_donation(donation)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DuplicateKeyError:
+        # Resubmitted or replayed transaction, it was recorded already
+        raise HTTPException(status_code=409, detail="A donation with this tx_signature already exists")
     return {
         "status_code": 201,
         "response_type": "success",
@@ -100,19 +163,23 @@ async def delete_donation_route(id: PydanticObjectId):
 @router.get(
     "/total/{user_id}", 
     response_model=Response,
-    description="Calculate the total amount of cryptocurrency donations made by a specific user identified by their wallet address. Aggregates all donation records associated with the provided user_id, summing up the donation amounts across all transactions. Essential for donor recognition, financial reporting, and tracking individual donor contributions to charitable causes. Returns 404 if no donations found for the user."
+    description="Calculate the total amount of cryptocurrency donations made by a specific user identified by their wallet address. Totals are computed by a MongoDB aggregation and returned per currency, optionally broken down further by charity (by_charity=true) and by month (by_month=true), alongside the overall total_amount and donation_count. The individual donation records are only included when include_donations=true. Essential for donor recognition, financial reporting, and tracking individual donor contributions to charitable causes. Returns 404 if no donations found for the user."
 )
-async def get_total_donations_amount_by_user(user_id: PydanticObjectId):
-    donations, donation_amount = await retrieve_donations_done_by_user(user_id)
-    if donations:
+async def get_total_donations_amount_by_user(
+    user_id: PydanticObjectId,
+    by_charity: bool = False,
+    by_month: bool = False,
+    include_donations: bool = False,
+):
+    summary = await retrieve_donations_done_by_user(
+        user_id, by_charity=by_charity, by_month=by_month, include_donations=include_donations
+    )
+    if summary["donation_count"]:
         return {
             "status_code": 200,
             "response_type": "success",
             "description": "Total donations retrieved successfully",
-            "data": {
-                "donations": donations,
-                "total_amount": donation_amount
-            },
+            "data": summary,
         }
     raise HTTPException(status_code=404, detail="No donations found for the user")
 
@@ -120,15 +187,23 @@ async def get_total_donations_amount_by_user(user_id: PydanticObjectId):
 @router.get(
     "/history/{user_id}", 
     response_model=Response,
-    description="Retrieve the complete history of cryptocurrency donations made by a specific user identified by their wallet address. Returns all donation records associated with the provided user_id, including amounts, currencies, timestamps, and linked charities. Essential for donor transparency, financial tracking, and generating personalized donor reports. Returns 404 if no donation history found for the user."
+    description="Retrieve the complete history of cryptocurrency donations made by a specific user identified by their wallet address. Returns all donation records associated with the provided user_id, including amounts, currencies, timestamps, and linked charities. Results are paginated newest first with limit and after (the next_cursor of the previous page). Essential for donor transparency, financial tracking, and generating personalized donor reports. Returns 404 if no donation history found for the user."
 )
-async def retrieve_donations_history_by_user(user_id: PydanticObjectId):
-    donations = await retrieve_donations_history(user_id)
+async def retrieve_donations_history_by_user(
+    user_id: PydanticObjectId, limit: int = None, after: str = None, fields: str = None
+):
+    try:
+        donations, next_cursor = await retrieve_donations_history(
+            user_id, limit=limit, after=after, fields=fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if donations:
         return {
             "status_code": 200,
             "response_type": "success",
             "description": "Donations history retrieved successfully",
             "data": donations,
+            "next_cursor": next_cursor,
         }
     raise HTTPException(status_code=404, detail="No donation history found for the user")
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Body, HTTPException
+import asyncio
+from fastapi import APIRouter, Body, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi import Response as HTTPResponse
 from typing import Optional
 from models.form import Form
 from schemas.form import FormModel, NewMessageModel, Response
-from services.form_service import get_form_by_alert, add_message_to_form
+from services.form_service import get_form_by_alert, get_form_version, add_message_to_form
 from services.form_service import get_active_form_by_user
+from services.forum_hub import forum_hub
+from services.http_cache import NO_CACHE, conditional, version_etag
 
 router = APIRouter()
 
@@ -11,9 +15,21 @@ router = APIRouter()
 @router.get(
     "/alert/{alert_id}", 
     response_model=Response,
-    description="Retrieve the communication form associated with a specific emergency alert by alert_id. Returns the complete form structure including all message threads, user communications, timestamps, and form metadata. Each form contains an array of messages with user_id (wallet address or user identifier), message content, and UTC timestamps. Essential for emergency communication coordination, stakeholder updates, and maintaining communication audit trails during crisis response. Returns 404 if no form exists for the specified alert."
+    description="Retrieve the communication form associated with a specific emergency alert by alert_id. Returns the complete form structure including all message threads, user communications, timestamps, and form metadata. Each form contains an array of messages with user_id (wallet address or user identifier), message content, and UTC timestamps. Essential for emergency communication coordination, stakeholder updates, and maintaining communication audit trails during crisis response. Returns 404 if no form exists for the specified alert. Supports conditional requests: send the ETag back as If-None-Match (or the Last-Modified value as If-Modified-Since) to get a 304 when no message was added since."
 )
-async def get_form(alert_id: str):
+async def get_form(alert_id: str, request: Request, response: HTTPResponse):
+    version = await get_form_version(alert_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Form not found for this alert")
+    not_modified = conditional(
+        request,
+        response,
+        version_etag(str(version["_id"]), version.get("version", 0), version.get("updated_at")),
+        cache_control=NO_CACHE,
+        last_modified=version.get("updated_at"),
+    )
+    if not_modified:
+        return not_modified
     form = await get_form_by_alert(alert_id)
     if not form:
         raise HTTPException(status_code=404, detail="Form not found for this alert")
@@ -25,35 +41,72 @@ async def get_form(alert_id: str):
     }
 
 
+@router.websocket("/alert/{alert_id}/ws")
+async def forum_updates(websocket: WebSocket, alert_id: str):
+    """
+    Live feed of an alert's forum. Every message posted after the connection
+    opened is pushed as a JSON object (user_id, content, timestamp), so clients
+    load the form once and then stop polling it.
+    """
+    await websocket.accept()
+    async with forum_hub.subscribe(alert_id) as queue:
+
+        async def push():
+            while True:
+                await websocket.send_json(await queue.get())
+
+        async def drain():
+            # Incoming frames are ignored, reading them is how a disconnect shows up
+            try:
+                while True:
+                    await websocket.receive_text()
+            except WebSocketDisconnect:
+                pass
+
+        tasks = [asyncio.create_task(push()), asyncio.create_task(drain())]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
 @router.post(
     "/alert/{alert_id}/message", 
     response_model=Response,
-    description="Add a new message to the communication form associated with a specific emergency alert. Requires user_id (wallet address or user identifier) and message content through NewMessageModel schema. Automatically timestamps the message with UTC datetime and appends it to the existing message thread. Updates the form's last modified timestamp for tracking communication activity. Critical for real-time emergency communication, stakeholder coordination, status updates, and maintaining chronological communication records during crisis response efforts."
+    description="Add a new message to the communication form associated with a specific emergency alert. Requires user_id (wallet address or user identifier) and message content through NewMessageModel schema. Automatically timestamps the message with UTC datetime and appends it to the existing message thread, creating the form on the first post. Updates the form's last modified timestamp for tracking communication activity and returns only the new message. Critical for real-time emergency communication, stakeholder coordination, status updates, and maintaining chronological communication records during crisis response efforts."
 )
 async def post_message(alert_id: str, message: NewMessageModel = Body(...)):
-    form = await add_message_to_form(alert_id, message.dict())
+    new_message = await add_message_to_form(alert_id, message.dict())
     return {
         "status_code": 200,
         "response_type": "success",
         "description": "Message added to form",
-        "data": form,
+        "data": new_message,
     }
 
 
 @router.post(
     "/user/{user_id}/active_alerts_forum",
     response_model=Response,
-    description="Retrieve a list of active communities for a specific user based on their user_id. Returns an array of community identifiers where the user is actively participating. Useful for personalized user experiences, community engagement tracking, and facilitating targeted communications within active community groups."
+    description="Retrieve a list of active communities for a specific user based on their user_id. Returns one entry per forum the user has posted in (alert_id, first_posted_at, last_posted_at, message_count), most recently active first. Useful for personalized user experiences, community engagement tracking, and facilitating targeted communications within active community groups. Paginated with limit and after (the next_cursor of the previous page), and fields (comma separated) to return only selected fields."
 )
-async def get_active_alerts_by_user(user_id: str):
+async def get_active_alerts_by_user(
+    user_id: str, limit: int = None, after: str = None, fields: str = None
+):
     """
     This endpoint retrieves the active communities for a user based on their user_id.
     It returns a list of community identifiers where the user is actively participating.
     """
-    forums = await get_active_form_by_user(user_id)
+    try:
+        forums, next_cursor = await get_active_form_by_user(
+            user_id, limit=limit, after=after, fields=fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
         "status_code": 200,
         "response_type": "success",
         "description": "Active communities retrieved successfully",
         "data": forums,
+        "next_cursor": next_cursor,
     }
\ No newline at end of file
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from fastapi.responses import HTMLResponse
 import os
+from services.chat_cache import chat_response_cache
+from services.llm_gateway import llm_gateway
 
 router = APIRouter()
 
@@ -38,4 +40,13 @@ async def read_root():
                 </div>
             </body>
         </html>
-        """) 
\ No newline at end of file
+        """) 
+
+
+@router.get(
+    "/metrics/llm",
+    summary="LLM Gateway Metrics",
+    description="Current load of the shared Gemini gateway used by alert ingestion and alert chat: configured max_in_flight and timeout, calls in flight and queued, completed/failed/timed out counters, and average and maximum queue wait and call latency in seconds. Also reports entries, hits and misses of the alert chat response cache."
+)
+async def llm_metrics():
+    return {**llm_gateway.metrics(), "chat_cache": chat_response_cache.stats()}
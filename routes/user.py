@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, HTTPException
 from beanie import PydanticObjectId
+from pymongo.errors import DuplicateKeyError
 from typing import List
 
 from models.user import User
@@ -57,7 +58,10 @@ async def get_user(id: PydanticObjectId):
     description="Create a new user account in the AidAgent platform with wallet-based identity. Requires fullname, email, and wallet_address as mandatory fields. The wallet_address serves as the primary identity mechanism for blockchain-based donations and transactions. Optional location field can store GPS coordinates or text-based location. Automatically timestamps registration with UTC datetime. Returns 201 status with created user data."
 )
 async def create_user(user: User = Body(...)):
-    new_user = await add_user(user)
+    try:
+        new_user = await add_user(user)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A user with this wallet address already exists")
     return {
         "status_code": 201,
         "response_type": "success",
@@ -72,7 +76,10 @@ async def create_user(user: User = Body(...)):
     description="Update existing user account information by MongoDB ObjectId. Supports partial updates through UpdateUserModel schema - only provided fields will be modified while preserving existing data. Commonly used for profile updates, location changes, or contact information modifications. Maintains data integrity by validating email format and preserving wallet address immutability. Returns 404 if user not found."
 )
 async def update_user(id: PydanticObjectId, req: UpdateUserModel = Body(...)):
-    updated_user = await update_user_data(id, req.dict())
+    try:
+        updated_user = await update_user_data(id, req.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A user with this wallet address already exists")
     if updated_user:
         return {
             "status_code": 200,
@@ -1,6 +1,7 @@
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Union
 from datetime import datetime
 from pydantic import BaseModel, Field
+from models.alert import Alert as AlertDocument
 
 
 class MetaInfo(BaseModel):
@@ -53,6 +54,7 @@ class Response(BaseModel):
     response_type: str
     description: str
     data: Optional[Any]
+    next_cursor: Optional[str] = None
 
     class Config:
         schema_extra = {
@@ -63,3 +65,8 @@ class Response(BaseModel):
                 "data": None,
             }
         }
+
+
+class AlertPage(Response):
+    # Typed so the list is serialized by pydantic's compiled serializer, projected pages hold dicts
+    data: List[Union[AlertDocument, Dict[str, Any]]]
@@ -51,3 +51,4 @@ class Response(BaseModel):
     response_type: str
     description: str
     data: Optional[Any]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,6 @@
-from typing import Optional, Any
+from typing import Optional, Any, Dict, List, Union
 from pydantic import BaseModel
+from models.donation import Donation
 
 
 class DonationModel(BaseModel):
@@ -39,3 +40,9 @@ class Response(BaseModel):
     response_type: str
     description: str
     data: Optional[Any]
+    next_cursor: Optional[str] = None
+
+
+class DonationPage(Response):
+    # Typed so the list is serialized by pydantic's compiled serializer, projected pages hold dicts
+    data: List[Union[Donation, Dict[str, Any]]]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -27,3 +27,4 @@ class Response(BaseModel):
     response_type: str
     description: str
     data: object
+    next_cursor: Optional[str] = None
@@ -1,125 +1,248 @@
-import google.generativeai as genai
-from models.alert_chat import AlertChat
-from config.config import Settings
-from typing import List, Dict
+from models.alert_chat import AlertChat, AlertChatMessage
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
-from models.alert import Alert
+from services.alert_context import AlertPromptContext, alert_context_store
+from services.chat_cache import chat_response_cache
+from services.chat_history import ChatWindow, build_chat_window, chat_summarizer
+from services.llm_gateway import llm_gateway
+from services.pagination import clamp_limit
 
-genai.configure(api_key=Settings().genai_api_key)
+GEMINI_ERROR_REPLY = "Sorry, I couldn't process your request at the moment."
 
-# Initialize Gemini model
-model = genai.GenerativeModel("gemini-2.0-flash")
 
+async def _prepare_chat(
+    alert_id: str, user_message: str, user_id: str
+) -> Tuple[AlertPromptContext, ChatWindow, Optional[tuple]]:
+    """
+    Record the user's message (creating the chat session if needed) and build
+    the Gemini prompt. The alert context travels as the model's system
+    instruction, so the prompt window only holds the conversation. Also
+    returns the response cache key for the question, or None when the reply
+    depends on earlier turns of the conversation.
+    Raises ValueError if the alert does not exist.
+    """
+    context = await alert_context_store.get(alert_id)
+    if context is None:
+        raise ValueError("Alert not found")
+    # Add user message to conversation history, creating the chat if needed
+    await AlertChat.append_message(alert_id, user_id, "user", user_message)
 
-async def chat_about_alert(alert_id: str, user_message: str, user_id: str) -> str:
-    # Find or create chat session
-    alert_chat = await AlertChat.find_one(
-        AlertChat.alert_id == alert_id, AlertChat.user_id == user_id
-    )
-    alert = await Alert.find_one(Alert.alert_id == alert_id)
-    alert_context ={
-            "alert_id": alert.alert_id,
-            "message": alert.message,
-            "location": alert.location,
-            "city": alert.city,
-            "related_request_id": alert.related_request_id,
-            "timestamp": alert.timestamp.isoformat(),
-            "aid_available": alert.aid_available,
-            "missing_persons_reported": alert.missing_persons_reported,
-            "source": alert.source,
-            "details": alert.details
-        }
-    if not alert_chat:
-        alert_chat = AlertChat(alert_id=alert_id, user_id=user_id, messages=[])
-        await alert_chat.create()
+    # Summary of older turns plus the newest messages that fit the token budget
+    window = await build_chat_window(alert_id, user_id)
 
-    # Add user message to conversation history
-    alert_chat.messages.append({
-        "role": "user",
-        "content": user_message ,
-        "timestamp": datetime.utcnow(),
-    })
+    # Only an opening question is independent of the conversation so far
+    cache_key = None
+    if window.opening:
+        cache_key = chat_response_cache.key(alert_id, context.version, user_message)
+    return context, window, cache_key
 
-    # Prepare recent messages (limit to last 5)
-    recent_messages = alert_chat.messages[-5:]
 
-    # Convert to Gemini-compatible format
-    prompt = [
-        {
-            "role": "assistant",
-            "parts": [
-                f"You are a helpful assistant that provides information about alerts. You will answer questions based on the alert details provided. Nothing else. | Context: {alert_context}. You are a helpful assistant that provides information about alerts. You will answer questions based on the alert details provided. Nothing else."
-            ]
-        }
-    ]
-    prompt.extend([
-        {
-            "role": "model" if msg["role"] == "ai" else msg["role"],
-            "parts": [
-                f'{msg["content"]}'
-            ]
-        }
-        for msg in recent_messages
-    ])
+async def _save_reply(alert_id: str, user_id: str, reply: str) -> None:
+    # Save AI response
+    await AlertChat.append_message(alert_id, user_id, "ai", reply)
 
-    # Get Gemini response
-    try:
-        gemini_response = await ask_gemini_with_context(prompt)
-    except Exception as e:
-        return f"Failed to get response from Gemini: {e}"
 
-    # Save AI response
-    alert_chat.messages.append({
-        "role": "ai",
-        "content": gemini_response,
-        "timestamp": datetime.utcnow()
-    })
+def _summarize_overflow(alert_id: str, user_id: str, window: ChatWindow) -> None:
+    # Fold the turns that fell out of the window into the summary, off the request path
+    if window.summarize_before is not None:
+        chat_summarizer.schedule(alert_id, user_id, window.summarize_before)
+
 
-    await alert_chat.save()
+async def chat_about_alert(alert_id: str, user_message: str, user_id: str) -> str:
+    context, window, cache_key = await _prepare_chat(alert_id, user_message, user_id)
+
+    gemini_response = chat_response_cache.get(cache_key) if cache_key else None
+    if gemini_response is None:
+        # Get Gemini response
+        try:
+            gemini_response = await ask_gemini_with_context(window.prompt, context)
+        except Exception as e:
+            return f"Failed to get response from Gemini: {e}"
+        if cache_key and gemini_response != GEMINI_ERROR_REPLY:
+            chat_response_cache.set(cache_key, gemini_response)
+
+    await _save_reply(alert_id, user_id, gemini_response)
+    _summarize_overflow(alert_id, user_id, window)
     return gemini_response
 
 
-async def ask_gemini_with_context(prompt: List[Dict[str, str]]) -> str:
+async def stream_chat_about_alert(alert_id: str, user_message: str, user_id: str) -> AsyncIterator[str]:
+    """
+    Same as chat_about_alert but returns an iterator over the reply's text
+    chunks as Gemini produces them. The assembled reply is saved once the
+    stream has completed. Raises ValueError up front if the alert does not exist.
+    """
+    context, window, cache_key = await _prepare_chat(alert_id, user_message, user_id)
+    cached_reply = chat_response_cache.get(cache_key) if cache_key else None
+
+    async def reply_chunks():
+        if cached_reply is not None:
+            yield cached_reply
+            await _save_reply(alert_id, user_id, cached_reply)
+            return
+        parts = []
+        async for text in llm_gateway.stream_chat(
+            history=window.prompt[:-1], message=user_message, model=context.model
+        ):
+            parts.append(text)
+            yield text
+        reply = "".join(parts).strip()
+        if cache_key and reply:
+            chat_response_cache.set(cache_key, reply)
+        await _save_reply(alert_id, user_id, reply)
+        _summarize_overflow(alert_id, user_id, window)
+
+    return reply_chunks()
+
+
+async def ask_gemini_with_context(prompt: List[Dict[str, str]], context: AlertPromptContext) -> str:
     """
     Send properly formatted message history to Gemini and return AI response.
-    Each message must follow Gemini's expected format.
+    Each message must follow Gemini's expected format, the alert itself is
+    carried by the context's model.
     """
     try:
-        # Start chat with full history
-        chat = model.start_chat(history=prompt)
-
         # Get last user message for reply
         last_user_message = next(
             m["parts"][0] for m in reversed(prompt) if m["role"] == "user"
         )
 
-        # Send message and return response
-        response = chat.send_message(last_user_message)
+        # Send message with full history through the shared gateway
+        response = await llm_gateway.chat(
+            history=prompt[:-1], message=last_user_message, model=context.model
+        )
         return response.text.strip()
     except Exception as e:
         print(f"Error communicating with Gemini: {e}")
-        return "Sorry, I couldn't process your request at the moment."
+        return GEMINI_ERROR_REPLY
 
-async def get_chat_history(alert_id: str, user_id: str) -> List[Dict[str, str]]:
+async def get_alert_chat(alert_id: str, user_id: str) -> Optional[AlertChat]:
     """
-    Retrieve chat history for a specific alert and user.
-    Returns a list of messages with roles and content.
+    Retrieve a chat session without its messages, moving legacy embedded
+    messages to chat_messages first. message_count changes with every new
+    message, which makes it a cheap version of the conversation.
     """
     alert_chat = await AlertChat.find_one(
         AlertChat.alert_id == alert_id, AlertChat.user_id == user_id
     )
-    
+    if not alert_chat:
+        return None
+    if alert_chat.messages:
+        await AlertChat.migrate_embedded_messages(alert_chat.id)
+        alert_chat.messages = []
+    return alert_chat
+
+
+async def latest_chat_seq(alert_id: str, user_id: str) -> Optional[int]:
+    """
+    Seq of the newest stored message, None for an empty conversation.
+    """
+    newest = await AlertChatMessage.get_motor_collection().find_one(
+        {"alert_id": alert_id, "user_id": user_id},
+        projection={"seq": 1, "_id": 0},
+        sort=[("seq", -1)],
+    )
+    return newest["seq"] if newest else None
+
+
+async def get_chat_messages(
+    alert_id: str,
+    user_id: str,
+    limit: Optional[int] = None,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    since: Optional[datetime] = None,
+) -> Tuple[List[AlertChatMessage], bool]:
+    """
+    One page of a conversation, oldest first, and whether more messages lie
+    beyond it. With `after` (a seq) or `since` (a timestamp) the page holds
+    the messages that follow, which is how a polling client fetches only what
+    is new; otherwise it holds the newest messages, older than `before` if given.
+    """
+    limit = clamp_limit(limit)
+    query = [AlertChatMessage.alert_id == alert_id, AlertChatMessage.user_id == user_id]
+    if before is not None:
+        query.append(AlertChatMessage.seq < before)
+    if after is not None:
+        query.append(AlertChatMessage.seq > after)
+    if since is not None:
+        query.append(AlertChatMessage.timestamp > since)
+
+    forward = after is not None or since is not None
+    sort = +AlertChatMessage.seq if forward else -AlertChatMessage.seq
+    messages = await AlertChatMessage.find(*query).sort(sort).limit(limit + 1).to_list()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if not forward:
+        messages.reverse()
+    return messages, has_more
+
+
+async def get_chat_history(
+    alert_id: str,
+    user_id: str,
+    limit: Optional[int] = None,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+) -> List[Dict[str, str]]:
+    """
+    Retrieve chat history for a specific alert and user.
+    Returns one page of messages with roles and content.
+    """
+    alert_chat = await get_alert_chat(alert_id, user_id)
+
     if not alert_chat:
         return []
 
+    messages, _ = await get_chat_messages(alert_id, user_id, limit, before, after)
+
     # Format messages for output
     chat_history = [
         {
-            "role": msg["role"],
-            "content": msg["content"],
-            "timestamp": msg["timestamp"].isoformat()
+            "seq": msg.seq,
+            "role": msg.role,
+            "content": msg.content,
+            "timestamp": msg.timestamp.isoformat()
         }
-        for msg in alert_chat.messages
+        for msg in messages
     ]
-    
-    return chat_history
\ No newline at end of file
+
+    return chat_history
+
+
+async def merge_duplicate_chats(database) -> int:
+    """
+    Fold chat sessions that share (alert_id, user_id) into the oldest one,
+    keeping every embedded message in timestamp order. Sessions created
+    before the unique index could be duplicated by concurrent first
+    messages, and initiate_database can't build the index over them. Run
+    once before deploying it. Returns the number of sessions removed.
+    """
+    collection = database[AlertChat.Settings.name]
+    pipeline = [
+        {"$group": {
+            "_id": {"alert_id": "$alert_id", "user_id": "$user_id"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    removed = 0
+    async for group in collection.aggregate(pipeline):
+        chats = await collection.find({"_id": {"$in": group["ids"]}}).sort("created_at", 1).to_list(None)
+        keep, duplicates = chats[0], chats[1:]
+        messages = sorted(
+            (message for chat in chats for message in chat.get("messages") or []),
+            key=lambda message: message.get("timestamp") or datetime.min,
+        )
+        await collection.update_one(
+            {"_id": keep["_id"]},
+            {"$set": {
+                "messages": messages,
+                "message_count": max(chat.get("message_count", 0) for chat in chats),
+                "updated_at": max(chat.get("updated_at") or keep["created_at"] for chat in chats),
+            }},
+        )
+        result = await collection.delete_many({"_id": {"$in": [chat["_id"] for chat in duplicates]}})
+        removed += result.deleted_count
+    return removed
@@ -0,0 +1,140 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional
+import google.generativeai as genai
+from cachetools import TTLCache
+from config.config import Settings
+from models.alert import Alert
+from services.chat_cache import alert_content_version
+
+settings = Settings()
+
+
+@dataclass
+class AlertPromptContext:
+    alert_id: str
+    version: str
+    context: dict
+    system_prompt: str
+    model: genai.GenerativeModel
+    cached_content: Optional[object] = None  # genai.caching.CachedContent when context caching is on
+
+
+def build_alert_context(alert: Alert) -> dict:
+    return {
+        "alert_id": alert.alert_id,
+        "message": alert.message,
+        "location": alert.location,
+        "city": alert.city,
+        "related_request_id": alert.related_request_id,
+        "timestamp": alert.timestamp.isoformat(),
+        "aid_available": alert.aid_available,
+        "missing_persons_reported": alert.missing_persons_reported,
+        "source": alert.source,
+        "details": alert.details
+    }
+
+
+def build_system_prompt(alert_context: dict) -> str:
+    return (
+        "You are a helpful assistant that provides information about alerts. "
+        "You will answer questions based on the alert details provided. Nothing else. "
+        f"| Context: {alert_context}."
+    )
+
+
+class AlertContextStore:
+    """
+    Per-alert prompt context, built once and reused by every chat turn until
+    the alert changes. Entries expire after alert_context_ttl_seconds, which
+    bounds how long another worker process can serve a context for an alert
+    that was edited elsewhere.
+
+    With llm_context_cache_enabled the static system prompt is also uploaded
+    to Gemini's context cache, so it is not re-tokenized on every turn. When
+    that fails, the alert version is not retried for retry_after seconds and
+    turns use the plain system instruction meanwhile.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, retry_after: float):
+        self._ttl = ttl
+        self._contexts = TTLCache(maxsize=maxsize, ttl=ttl)
+        # (alert_id, version) of contexts that recently failed to cache remotely
+        self._cache_failures = TTLCache(maxsize=maxsize, ttl=retry_after)
+
+    async def get(self, alert_id: str) -> Optional[AlertPromptContext]:
+        context = self._contexts.get(alert_id)
+        if context is None:
+            alert = await Alert.find_one(Alert.alert_id == alert_id)
+            if not alert:
+                return None
+            context = self.refresh(alert)
+        if (
+            settings.llm_context_cache_enabled
+            and context.cached_content is None
+            and (context.alert_id, context.version) not in self._cache_failures
+        ):
+            await self._cache_remotely(context)
+        return context
+
+    def refresh(self, alert: Alert) -> AlertPromptContext:
+        """
+        (Re)build the context of an alert, e.g. after it was created or updated.
+        """
+        alert_context = build_alert_context(alert)
+        version = alert_content_version(alert_context)
+        current = self._contexts.get(alert.alert_id)
+        if current is not None and current.version == version:
+            return current
+        self.invalidate(alert.alert_id)
+        system_prompt = build_system_prompt(alert_context)
+        context = AlertPromptContext(
+            alert_id=alert.alert_id,
+            version=version,
+            context=alert_context,
+            system_prompt=system_prompt,
+            model=genai.GenerativeModel(settings.llm_model_name, system_instruction=system_prompt),
+        )
+        self._contexts[alert.alert_id] = context
+        return context
+
+    def invalidate(self, alert_id: str) -> None:
+        context = self._contexts.pop(alert_id, None)
+        if context is not None and context.cached_content is not None:
+            asyncio.get_running_loop().run_in_executor(None, self._delete_remote, context.cached_content)
+
+    async def _cache_remotely(self, context: AlertPromptContext) -> None:
+        try:
+            cached_content = await asyncio.wait_for(
+                asyncio.to_thread(
+                    genai.caching.CachedContent.create,
+                    model=f"models/{settings.llm_model_name}",
+                    display_name=f"alert-{context.alert_id}-{context.version}",
+                    system_instruction=context.system_prompt,
+                    # Outlive the local entry so a context in use never points at an expired cache
+                    ttl=timedelta(seconds=self._ttl + 60),
+                ),
+                timeout=settings.llm_timeout_seconds,
+            )
+        except Exception as e:
+            # Too short to cache or unsupported model, keep using the plain system instruction
+            print(f"Context caching unavailable for alert {context.alert_id}: {e}")
+            self._cache_failures[(context.alert_id, context.version)] = True
+            return
+        context.cached_content = cached_content
+        context.model = genai.GenerativeModel.from_cached_content(cached_content)
+
+    @staticmethod
+    def _delete_remote(cached_content) -> None:
+        try:
+            cached_content.delete()
+        except Exception as e:
+            print(f"Error deleting cached context {cached_content.name}: {e}")
+
+
+alert_context_store = AlertContextStore(
+    maxsize=settings.alert_context_max_entries,
+    ttl=settings.alert_context_ttl_seconds,
+    retry_after=settings.llm_context_cache_retry_seconds,
+)
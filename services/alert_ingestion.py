@@ -0,0 +1,119 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from beanie import PydanticObjectId
+from pymongo import UpdateOne
+from models.alert import Alert
+
+
+def _clean_text(value) -> str:
+    return " ".join(str(value or "").split())
+
+
+def _parse_timestamp(value) -> datetime:
+    if isinstance(value, datetime):
+        timestamp = value
+    else:
+        try:
+            timestamp = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+        except ValueError:
+            return datetime.utcnow()
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def alert_fingerprint(title: str, city: str, event_date: datetime, location: str) -> str:
+    """
+    Stable identity of an ingested event: the same title, city and day always
+    map to the same alert of a location no matter how often Gemini reports
+    it. An event reported for two locations is one alert per location.
+    """
+    key = "|".join([
+        location,
+        _clean_text(title).lower(),
+        _clean_text(city).lower(),
+        event_date.strftime("%Y-%m-%d"),
+    ])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def normalize_alert(alert_dict: dict, location: str) -> Optional[dict]:
+    """
+    Turn one event from Gemini into the fields stored on Alert.
+    Returns None for entries that have no title.
+    """
+    if not isinstance(alert_dict, dict):
+        return None
+    title = _clean_text(alert_dict.get("title"))
+    if not title:
+        return None
+    city = _clean_text(alert_dict.get("location"))
+    timestamp = _parse_timestamp(alert_dict.get("timestamp") or datetime.utcnow())
+    details = alert_dict.get("details") or []
+    aid_available = alert_dict.get("aid_available") or []
+    return {
+        "fingerprint": alert_fingerprint(title, city, timestamp, location),
+        "message": title,
+        "location": location,
+        "city": city,
+        "related_request_id": alert_dict.get("related_request_id"),
+        "timestamp": timestamp,
+        "details": [_clean_text(d) for d in details if d] if isinstance(details, list) else [],
+        "aid_available": [a for a in aid_available if isinstance(a, dict)] if isinstance(aid_available, list) else [],
+        "missing_persons_reported": _clean_text(alert_dict.get("missing_persons_reported")),
+        "source": _clean_text(alert_dict.get("source")) or "Unknown",
+        "meta": {},
+    }
+
+
+async def upsert_alerts(alert_dicts: List[dict], location: str) -> int:
+    """
+    Normalize a batch of Gemini events and write it with a single bulk_write
+    of upserts keyed on the fingerprint. Returns the number of new alerts.
+    """
+    normalized: Dict[str, dict] = {}
+    for alert_dict in alert_dicts:
+        fields = normalize_alert(alert_dict, location)
+        if fields:
+            normalized[fields["fingerprint"]] = fields
+    if not normalized:
+        return 0
+
+    operations = [
+        UpdateOne(
+            {"fingerprint": fingerprint},
+            {
+                "$set": fields,
+                "$inc": {"version": 1},
+                "$setOnInsert": {"alert_id": str(PydanticObjectId())},
+            },
+            upsert=True,
+        )
+        for fingerprint, fields in normalized.items()
+    ]
+    result = await Alert.get_motor_collection().bulk_write(operations, ordered=False)
+    return result.upserted_count
+
+
+async def refingerprint_alerts() -> int:
+    """
+    Recompute the fingerprint of every ingested alert from its stored fields,
+    e.g. after the fingerprint started covering the location. Returns the
+    number of alerts whose fingerprint changed.
+    """
+    collection = Alert.get_motor_collection()
+    operations = []
+    async for doc in collection.find(
+        {"fingerprint": {"$type": "string"}},
+        projection={"message": 1, "city": 1, "timestamp": 1, "location": 1, "fingerprint": 1},
+    ):
+        fingerprint = alert_fingerprint(
+            doc.get("message") or "", doc.get("city") or "", doc["timestamp"], doc.get("location") or "global"
+        )
+        if fingerprint != doc["fingerprint"]:
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"fingerprint": fingerprint}}))
+    if not operations:
+        return 0
+    result = await collection.bulk_write(operations, ordered=False)
+    return result.modified_count
@@ -1,96 +1,178 @@
 import os
 import json
-import google.generativeai as genai
-from typing import List, Union, Optional
+from typing import List, Union, Optional, Tuple
 from datetime import datetime, timedelta
-from beanie import PydanticObjectId
+from beanie import PydanticObjectId, UpdateResponse
 from models.alert import Alert, MetaInfo
 from config.config import Settings
+from services.alert_ingestion import upsert_alerts
+from services.alert_context import alert_context_store
+from services.alert_worker import AlertRefreshWorker
+from services.cache import DocumentCache, cache_backend
+from services.chat_cache import chat_response_cache
+from services.llm_gateway import llm_gateway
+from services.lease_service import acquire_lease, new_lease_owner, release_lease
+from services.pagination import paginate
+from services.single_flight import SingleFlight
+
+settings = Settings()
+
+# Alerts by alert_id
+alert_cache = DocumentCache(cache_backend, Alert)
+
 async def add_alert(new_alert: Alert) -> Alert:
     alert = await new_alert.create()
+    alert_context_store.refresh(alert)
     return alert
 
 async def retrieve_alerts(
         location: Optional[str] = None,
-        refresh: bool = False
-) -> List[Alert]:   
-    # sort and filter alerts based on location and refresh flag
-    # alerts = await Alert.
-
+        refresh: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        fields: Optional[str] = None,
+) -> Tuple[List[Alert], Optional[str]]:
+    """
+    Serve the current snapshot of alerts for a location immediately and let the
+    background worker reload them from Gemini when they are missing or stale.
+    Returns one page of alerts, newest first, and the cursor of the next page.
+    """
     if location is None:
         location = "global"
-    alerts = await Alert.find(Alert.location == location).sort(Alert.timestamp.desc).to_list()
+    alerts, next_cursor = await paginate(
+        Alert,
+        {"location": location},
+        limit=limit,
+        after=after,
+        fields=fields,
+        sort_field="timestamp",
+        descending=True,
+    )
 
-    should_reload = False
-    meta_info = None
-    if not alerts:
-        should_reload = True
-    else:
-        # Assuming meta info is stored in one of the alerts, or globally
-        meta_info = await MetaInfo.find_one()  # Adjust based on your DB design
-        if not meta_info or not meta_info.last_loaded or meta_info.last_loaded < datetime.utcnow() - timedelta(days=1):
-            should_reload = True
     if refresh:
-        should_reload = True  # Force reload if location is specified
-    if should_reload:
-        new_data = await fetch_alert_details_from_gemini(location or "global")
-        if new_data:
-            # Save new alerts
-            for alert_dict in new_data :
-                alert = Alert(
-                    alert_id=alert_dict.get("alert_id", str(PydanticObjectId())),
-                    message=alert_dict.get("title", ""),
-                    location=location,  
-                    city=alert_dict.get("location", ""),
-                    related_request_id=alert_dict.get("related_request_id"),
-                    timestamp=alert_dict.get("timestamp", datetime.utcnow()),
-                    details=alert_dict.get("details", []),
-                    aid_available=alert_dict.get("aid_available", []),
-                    missing_persons_reported=alert_dict.get("missing_persons_reported", ""),
-                    source=alert_dict.get("source", "Unknown"),
-                    meta={}
-                )
-                await alert.create()
-            # Update meta info
-            if meta_info is not None:
-                meta_info.last_loaded = datetime.utcnow()
-                await meta_info.save()
-            else:
-                await MetaInfo(last_loaded=datetime.utcnow()).create()
-            alerts = await Alert.all().to_list()
-
-    
+        alert_refresh_worker.schedule(location, force=True)
+    elif await location_is_stale(location):
+        alert_refresh_worker.schedule(location)
+    else:
+        alert_refresh_worker.track(location)
+
+    return alerts, next_cursor
+
+
+async def retrieve_location_alerts(location: str) -> List[Alert]:
+    # Served by the (location, timestamp desc) index on Alert
+    return await Alert.find(Alert.location == location).sort(Alert.timestamp.desc).to_list()
+
+
+async def retrieve_meta_info(location: str) -> Optional[MetaInfo]:
+    return await MetaInfo.find_one(MetaInfo.location == location)
+
+
+async def location_is_stale(location: str) -> bool:
+    # Each location keeps its own freshness metadata, an empty location that
+    # was just attempted is not retried until alert_refresh_retry_seconds pass
+    meta_info = await retrieve_meta_info(location)
+    return meta_info is None or meta_info.is_stale(
+        default_ttl=timedelta(seconds=settings.alert_refresh_ttl_seconds),
+        retry_after=timedelta(seconds=settings.alert_refresh_retry_seconds),
+    )
+
+
+async def set_ingestion_status(location: str, status: str, **fields) -> None:
+    """
+    Upsert the freshness metadata of one location without touching the others.
+    """
+    await MetaInfo.get_motor_collection().update_one(
+        {"location": location},
+        {"$set": {"status": status, **fields}},
+        upsert=True,
+    )
+
+
+alert_reload_flight = SingleFlight()
+
+
+async def reload_alerts(location: str = "global", force: bool = False) -> List[Alert]:
+    """
+    Fetch fresh alerts for a location from Gemini and store them.
+    Runs on the background refresh worker, never on the request path.
+    Concurrent reloads of one location share a single run in this process,
+    and a Mongo lease keeps other worker processes from running it twice.
+    Unless forced, a location another process reloaded in the meantime is
+    not reloaded again.
+    """
+    return await alert_reload_flight.do(
+        location, lambda: _reload_alerts_under_lease(location, force)
+    )
+
+
+async def _reload_alerts_under_lease(location: str, force: bool = False) -> List[Alert]:
+    lease_key = f"alerts:{location}"
+    owner = new_lease_owner()
+    lease_ttl = timedelta(seconds=settings.alert_reload_lease_seconds)
+    if not await acquire_lease(lease_key, owner, lease_ttl):
+        # Another worker is already reloading this location
+        return await retrieve_location_alerts(location)
+    try:
+        # Queued while another worker held the lease, which may have just reloaded it
+        if not force and not await location_is_stale(location):
+            return await retrieve_location_alerts(location)
+        await set_ingestion_status(location, "loading", last_attempted=datetime.utcnow())
+        return await _load_alerts_from_gemini(location)
+    except Exception as e:
+        await set_ingestion_status(location, "failed", last_error=str(e))
+        raise
+    finally:
+        await release_lease(lease_key, owner)
+
+
+async def _load_alerts_from_gemini(location: str) -> List[Alert]:
+    new_data = await fetch_alert_details_from_gemini(location)
+    if not new_data:
+        await set_ingestion_status(location, "failed", last_error="No alerts returned")
+        return await retrieve_location_alerts(location)
+    await upsert_alerts(new_data, location)
+    await set_ingestion_status(
+        location, "loaded", last_loaded=datetime.utcnow(), last_error=None
+    )
+    alerts = await retrieve_location_alerts(location)
+    # The upserts may have rewritten any alert of the location
+    for alert in alerts:
+        await alert_cache.invalidate(alert.alert_id)
+        chat_response_cache.invalidate_alert(alert.alert_id)
+        alert_context_store.invalidate(alert.alert_id)
     return alerts
 
 
 async def retrieve_alert(alert_id: str) -> Optional[Alert]:
-    alert = await Alert.find_one(Alert.alert_id == alert_id)
-    return alert
+    return await alert_cache.get(
+        alert_id, lambda: Alert.find_one(Alert.alert_id == alert_id)
+    )
 
 
 async def update_alert(alert_id: str, data: dict) -> Union[Alert, bool]:
-    alert = await Alert.find_one(Alert.alert_id == alert_id)
+    update_data = {k: v for k, v in data.items() if v is not None}
+    alert = await Alert.find_one(Alert.alert_id == alert_id).update(
+        {"$set": update_data, "$inc": {"version": 1}}, response_type=UpdateResponse.NEW_DOCUMENT
+    )
     if not alert:
         return False
-    update_data = {k: v for k, v in data.items() if v is not None}
-    await alert.update({"$set": update_data})
+    await alert_cache.invalidate(alert_id)
+    chat_response_cache.invalidate_alert(alert_id)
+    alert_context_store.refresh(alert)
     return alert
 
 
 async def delete_alert(alert_id: str) -> bool:
-    alert = await Alert.find_one(Alert.alert_id == alert_id)
-    if not alert:
+    result = await Alert.find_one(Alert.alert_id == alert_id).delete()
+    if not result or not result.deleted_count:
         return False
-    await alert.delete()
+    await alert_cache.invalidate(alert_id)
+    chat_response_cache.invalidate_alert(alert_id)
+    alert_context_store.invalidate(alert_id)
     return True
 
 
-# Initialize Gemini
-genai.configure(api_key=Settings().genai_api_key)
-
-# Create a generative model
-model = genai.GenerativeModel("gemini-2.0-flash")
-
 async def fetch_alert_details_from_gemini(location: str = "global") -> Optional[List[dict]]:
     # last 30 days month
     previous_month = (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m")
@@ -153,7 +235,7 @@ async def fetch_alert_details_from_gemini(location: str = "global") -> Optional[
     """
 
     try:
-        response = model.generate_content(prompt)
+        response = await llm_gateway.generate(prompt)
         print(f"Response from Gemini: {response }")
         json_response = response.text.strip().replace("```json", "").replace("```", "")
         alert_list = json.loads(json_response)
@@ -177,9 +259,21 @@ async def update_alert_if_stale(alert_id: str) -> Optional[Alert]:
             alert.location = updated_data.get("location", alert.location)
             alert.timestamp = now
             if not alert.meta:
-                alert.meta = MetaInfo()
+                alert.meta = MetaInfo(location=alert.location or "global")
             alert.meta.last_loaded = now
+            alert.version += 1
             await alert.save()
+            await alert_cache.invalidate(alert_id)
+            chat_response_cache.invalidate_alert(alert_id)
+            alert_context_store.refresh(alert)
     return alert
 
+
+alert_refresh_worker = AlertRefreshWorker(
+    reload_alerts,
+    location_is_stale,
+    refresh_after=timedelta(seconds=settings.alert_refresh_ttl_seconds),
+    max_locations=settings.alert_refresh_max_locations,
+)
+
 # ask AI about the alert
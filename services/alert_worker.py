@@ -0,0 +1,108 @@
+import asyncio
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional, Set
+from cachetools import TTLCache
+
+
+class AlertRefreshWorker:
+    """
+    Background worker that refreshes alerts per location off the request path.
+    Requests enqueue a location and return immediately; the worker drains the
+    queue and periodically re-checks the locations requested within the last
+    refresh_after, refreshing those that is_stale reports as stale. Locations
+    nobody reads any more are forgotten, and at most max_locations are kept.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[..., Awaitable[object]],
+        is_stale: Callable[[str], Awaitable[bool]],
+        refresh_after: timedelta = timedelta(days=1),
+        sweep_interval: timedelta = timedelta(hours=1),
+        max_locations: int = 1024,
+    ):
+        self._refresh = refresh
+        self._is_stale = is_stale
+        self._sweep_interval = sweep_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Set[str] = set()
+        self._forced: Set[str] = set()
+        # Recently requested locations, each entry expires refresh_after after the last request
+        self._requested = TTLCache(maxsize=max_locations, ttl=refresh_after.total_seconds())
+        self._tasks = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._consume()),
+            asyncio.create_task(self._sweep()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+        self._forced.clear()
+
+    def track(self, location: str) -> None:
+        """
+        Record that a location was requested, keeping it in the sweep.
+        """
+        self._requested[location] = True
+
+    def schedule(self, location: str, force: bool = False) -> bool:
+        """
+        Queue a refresh for a location. A forced refresh reloads it even if
+        it is fresh. Returns False if one is already pending or the worker is
+        not running.
+        """
+        self.track(location)
+        return self._enqueue(location, force)
+
+    def _enqueue(self, location: str, force: bool = False) -> bool:
+        if self._queue is None:
+            return False
+        if force:
+            # Upgrades a refresh that is already pending
+            self._forced.add(location)
+        if location in self._pending:
+            return False
+        self._pending.add(location)
+        self._queue.put_nowait(location)
+        return True
+
+    async def _consume(self):
+        while True:
+            location = await self._queue.get()
+            force = location in self._forced
+            self._forced.discard(location)
+            try:
+                await self._refresh(location, force=force)
+            except Exception as e:
+                print(f"Error refreshing alerts for {location}: {e}")
+            finally:
+                self._pending.discard(location)
+                self._queue.task_done()
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(self._sweep_interval.total_seconds())
+            self._requested.expire()
+            for location in list(self._requested):
+                try:
+                    stale = await self._is_stale(location)
+                except Exception as e:
+                    print(f"Error checking alerts for {location}: {e}")
+                    continue
+                if stale:
+                    # Not through schedule(), only requests keep a location tracked
+                    self._enqueue(location)
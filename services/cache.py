@@ -0,0 +1,93 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Generic, Optional, Type, TypeVar
+from beanie import Document
+from cachetools import TTLCache
+from config.config import Settings
+
+D = TypeVar("D", bound=Document)
+
+settings = Settings()
+
+
+class CacheBackend(ABC):
+    """
+    Storage for cached documents. Values are plain dicts so that a shared
+    backend (e.g. Redis) only has to serialize JSON-like data.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Per-process TTL + LRU cache. Other workers only see a write once their
+    entry expires, so keep the TTL short.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: dict) -> None:
+        self._cache[key] = value
+
+    async def delete(self, key: str) -> None:
+        self._cache.pop(key, None)
+
+
+class DocumentCache(Generic[D]):
+    """
+    Read-through cache of one document type by a lookup key (its id or
+    another unique field). Every hit returns a fresh instance, so callers may
+    modify what they get without affecting other requests.
+    """
+
+    def __init__(self, backend: CacheBackend, model: Type[D]):
+        self._backend = backend
+        self._model = model
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, key) -> str:
+        return f"{self._model.__name__}:{key}"
+
+    async def get(self, key, load: Callable[[], Awaitable[Optional[D]]]) -> Optional[D]:
+        cached = await self._backend.get(self._key(key))
+        if cached is not None:
+            self._hits += 1
+            return self._model.model_validate(cached)
+        self._misses += 1
+        document = await load()
+        if document is not None:
+            await self.set(key, document)
+        return document
+
+    async def set(self, key, document: D) -> None:
+        await self._backend.set(self._key(key), document.model_dump())
+
+    async def invalidate(self, key) -> None:
+        await self._backend.delete(self._key(key))
+
+    def stats(self) -> dict:
+        return {"hits": self._hits, "misses": self._misses}
+
+
+CACHE_BACKENDS = {
+    "memory": lambda: InMemoryCacheBackend(
+        maxsize=settings.cache_max_entries, ttl=settings.cache_ttl_seconds
+    ),
+}
+
+cache_backend = CACHE_BACKENDS[settings.cache_backend]()
@@ -1,6 +1,10 @@
-from typing import List, Optional, Union
-from beanie import PydanticObjectId
+from typing import List, Optional, Tuple, Union
+from beanie import PydanticObjectId, UpdateResponse
 from models.charity import Charity
+from services.cache import DocumentCache, cache_backend
+from services.pagination import paginate
+
+charity_cache = DocumentCache(cache_backend, Charity)
 
 
 async def add_charity(new_charity: Charity) -> Charity:
@@ -8,33 +12,41 @@ async def add_charity(new_charity: Charity) -> Charity:
     return charity
 
 
-async def retrieve_charities() -> List[Charity]:
-    charities = await Charity.all().to_list()
-    return charities
+async def retrieve_charities(
+    limit: Optional[int] = None, after: Optional[str] = None, fields: Optional[str] = None
+) -> Tuple[List[Charity], Optional[str]]:
+    return await paginate(Charity, limit=limit, after=after, fields=fields)
 
 
-async def retrieve_charities_by_alert(alert_id: str) -> List[Charity]:
-    charities = await Charity.find(Charity.alert_id == alert_id).to_list()
-    return charities
+async def retrieve_charities_by_alert(
+    alert_id: str,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Tuple[List[Charity], Optional[str]]:
+    return await paginate(
+        Charity, {"alert_id": alert_id}, limit=limit, after=after, fields=fields
+    )
 
 
 async def retrieve_charity(id: PydanticObjectId) -> Optional[Charity]:
-    charity = await Charity.get(id)
-    return charity
+    return await charity_cache.get(id, lambda: Charity.get(id))
 
 
 async def update_charity(id: PydanticObjectId, data: dict) -> Union[Charity, bool]:
-    charity = await Charity.get(id)
+    update_data = {k: v for k, v in data.items() if v is not None}
+    charity = await Charity.find_one(Charity.id == id).update(
+        {"$set": update_data, "$inc": {"version": 1}}, response_type=UpdateResponse.NEW_DOCUMENT
+    )
     if not charity:
         return False
-    update_data = {k: v for k, v in data.items() if v is not None}
-    await charity.update({"$set": update_data})
+    await charity_cache.invalidate(id)
     return charity
 
 
 async def delete_charity(id: PydanticObjectId) -> bool:
-    charity = await Charity.get(id)
-    if not charity:
+    result = await Charity.find_one(Charity.id == id).delete()
+    if not result or not result.deleted_count:
         return False
-    await charity.delete()
+    await charity_cache.invalidate(id)
     return True
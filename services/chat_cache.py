@@ -0,0 +1,73 @@
+import hashlib
+import json
+import re
+from typing import Hashable, Optional, Tuple
+from cachetools import TTLCache
+from config.config import Settings
+
+settings = Settings()
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_question(question: str) -> str:
+    """
+    Lowercase, drop punctuation and collapse whitespace so trivially different
+    phrasings ("Where is the nearest shelter?" / "where is the nearest shelter")
+    share a cache entry.
+    """
+    return " ".join(_PUNCTUATION.sub(" ", question.lower()).split())
+
+
+def alert_content_version(alert_context: dict) -> str:
+    """
+    Short hash of the alert content a reply was generated from. Any change to
+    the alert gives a new version, so cached replies are never served for it.
+    """
+    payload = json.dumps(alert_context, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ChatResponseCache:
+    """
+    In-process TTL + LRU cache of Gemini replies keyed by
+    (alert_id, alert content version, normalized question).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(alert_id: str, version: str, question: str) -> Tuple[Hashable, ...]:
+        return alert_id, version, normalize_question(question)
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[str]:
+        reply = self._cache.get(key)
+        if reply is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return reply
+
+    def set(self, key: Tuple[Hashable, ...], reply: str) -> None:
+        self._cache[key] = reply
+
+    def invalidate_alert(self, alert_id: str) -> None:
+        for key in list(self._cache.keys()):
+            if key[0] == alert_id:
+                self._cache.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._cache),
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+
+chat_response_cache = ChatResponseCache(
+    maxsize=settings.chat_cache_max_entries,
+    ttl=settings.chat_cache_ttl_seconds,
+)
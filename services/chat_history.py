@@ -0,0 +1,164 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from models.alert_chat import AlertChat, AlertChatMessage
+from config.config import Settings
+from services.llm_gateway import llm_gateway
+
+settings = Settings()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count, about four characters per token for Gemini's
+    tokenizer on English text. Good enough to size a prompt, without a
+    count_tokens round trip per message.
+    """
+    return len(text) // 4 + 1
+
+
+@dataclass
+class ChatWindow:
+    prompt: List[Dict]  # Gemini history, oldest first, ending with the current message
+    opening: bool  # True when the current message is the first of the conversation
+    summarize_before: Optional[int] = None  # Seq of the oldest message in the window if older ones are unsummarized
+
+
+def _as_turn(message: AlertChatMessage) -> Dict:
+    return {
+        "role": "model" if message.role == "ai" else message.role,
+        "parts": [f'{message.content}'],
+    }
+
+
+async def build_chat_window(alert_id: str, user_id: str) -> ChatWindow:
+    """
+    Fit the conversation into chat_history_token_budget: the rolling summary
+    of older turns (if any) followed by as many of the newest messages as the
+    budget allows. The newest message is always included.
+    """
+    chat = await AlertChat.get_motor_collection().find_one(
+        {"alert_id": alert_id, "user_id": user_id},
+        projection={"summary": 1, "summary_through_seq": 1},
+    ) or {}
+    summary = chat.get("summary")
+    summary_through_seq = chat.get("summary_through_seq")
+
+    query = [AlertChatMessage.alert_id == alert_id, AlertChatMessage.user_id == user_id]
+    if summary_through_seq is not None:
+        query.append(AlertChatMessage.seq > summary_through_seq)
+    # One extra message tells whether anything older than the window is left
+    newest = await AlertChatMessage.find(*query).sort(
+        -AlertChatMessage.seq
+    ).limit(settings.chat_history_max_messages + 1).to_list()
+
+    budget = settings.chat_history_token_budget
+    if summary:
+        budget -= estimate_tokens(summary)
+    window: List[AlertChatMessage] = []
+    for message in newest[:settings.chat_history_max_messages]:
+        cost = estimate_tokens(message.content)
+        if window and cost > budget:
+            break
+        window.append(message)
+        budget -= cost
+    window.reverse()
+
+    prompt = []
+    if summary:
+        prompt.append({"role": "user", "parts": [f"Summary of our conversation so far: {summary}"]})
+        prompt.append({"role": "model", "parts": ["Understood."]})
+    prompt.extend(_as_turn(message) for message in window)
+    return ChatWindow(
+        prompt=prompt,
+        opening=len(newest) == 1 and not summary,
+        summarize_before=window[0].seq if len(newest) > len(window) else None,
+    )
+
+
+class ChatSummarizer:
+    """
+    Folds the messages that fell out of a chat's prompt window into the
+    rolling summary stored on AlertChat. Runs after the reply was returned,
+    at most one pass per conversation at a time.
+    """
+
+    def __init__(self):
+        self._pending: Set[Tuple[str, str]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def schedule(self, alert_id: str, user_id: str, before_seq: int) -> bool:
+        """
+        Summarize a conversation up to (excluding) before_seq in the
+        background. Returns False if a pass is already running for it.
+        """
+        key = (alert_id, user_id)
+        if key in self._pending:
+            return False
+        self._pending.add(key)
+        task = asyncio.create_task(self._run(alert_id, user_id, before_seq))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._pending.clear()
+
+    async def _run(self, alert_id: str, user_id: str, before_seq: int):
+        try:
+            await self.summarize(alert_id, user_id, before_seq)
+        except Exception as e:
+            print(f"Error summarizing chat {alert_id}/{user_id}: {e}")
+        finally:
+            self._pending.discard((alert_id, user_id))
+
+    async def summarize(self, alert_id: str, user_id: str, before_seq: int) -> bool:
+        collection = AlertChat.get_motor_collection()
+        chat = await collection.find_one(
+            {"alert_id": alert_id, "user_id": user_id},
+            projection={"summary": 1, "summary_through_seq": 1},
+        )
+        if not chat:
+            return False
+        summary = chat.get("summary")
+        summary_through_seq = chat.get("summary_through_seq")
+
+        query = [
+            AlertChatMessage.alert_id == alert_id,
+            AlertChatMessage.user_id == user_id,
+            AlertChatMessage.seq < before_seq,
+        ]
+        if summary_through_seq is not None:
+            query.append(AlertChatMessage.seq > summary_through_seq)
+        messages = await AlertChatMessage.find(*query).sort(
+            +AlertChatMessage.seq
+        ).limit(settings.chat_history_max_messages).to_list()
+        if not messages:
+            return False
+
+        transcript = "\n".join(f"{message.role}: {message.content}" for message in messages)
+        prompt = (
+            "Update the running summary of a conversation between a user and an assistant about an emergency alert. "
+            f"Keep every fact, location, number and open question that matters, in at most {settings.chat_summary_max_words} words. "
+            "Return only the summary.\n"
+            f"Current summary: {summary or 'None'}\n"
+            f"New messages:\n{transcript}"
+        )
+        response = await llm_gateway.generate(prompt)
+        new_summary = response.text.strip()
+        if not new_summary:
+            return False
+
+        # Only applies if no other worker moved the summary on in the meantime
+        result = await collection.update_one(
+            {"_id": chat["_id"], "summary_through_seq": summary_through_seq},
+            {"$set": {"summary": new_summary, "summary_through_seq": messages[-1].seq}},
+        )
+        return result.modified_count == 1
+
+
+chat_summarizer = ChatSummarizer()
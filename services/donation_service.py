@@ -1,44 +1,59 @@
-from typing import List, Union, Optional
+from typing import List, Union, Optional, Tuple
 from beanie import PydanticObjectId
+from config.config import Settings
 from models.donation import Donation
-from solana.rpc.async_api import AsyncClient
+from services.cache import DocumentCache, cache_backend
+from services.pagination import paginate
+from services.rollup_service import record_donation, remove_donation, replace_donation
+from services.solana_client import solana_rpc
 
-async def verify_transaction(tx_signature: str) -> bool:
-    client = AsyncClient("https://api.mainnet-beta.solana.com")
-    resp = await client.get_confirmed_transaction(tx_signature)
-    await client.close()
+settings = Settings()
+
+donation_cache = DocumentCache(cache_backend, Donation)
 
+async def verify_transaction(tx_signature: str) -> bool:
     # If transaction exists and confirmed, return True else False
-    return resp['result'] is not None
+    return await solana_rpc.transaction_confirmed(tx_signature)
+
+
+async def _verified_status(tx_signature: str) -> str:
+    if not settings.solana_verify_transactions:
+        return "confirmed"
+    try:
+        is_verified = await verify_transaction(tx_signature)
+    except ValueError:
+        raise ValueError("Invalid transaction signature.")
+    except Exception as e:
+        # RPC unreachable after retries, keep the donation and leave it unverified
+        print(f"Error verifying transaction {tx_signature}: {e}")
+        return "pending"
+    if not is_verified:
+        raise ValueError("Transaction verification failed. Please check the transaction signature.")
+    return "confirmed"
 
 
 async def add_donation(new_donation: Donation) -> Donation:
-    # donation = await new_donation.create()
-    tx_signature = new_donation.tx_signature
-    # is_verified = await verify_transaction(tx_signature)
-    # if not is_verified:
-    #     raise ValueError("Transaction verification failed. Please check the transaction signature.")
+    # Verified before the insert so the status is written once
+    new_donation.status = await _verified_status(new_donation.tx_signature)
     donation = await new_donation.create()
     if not donation:
         raise ValueError("Failed to create donation record.")
-    # Optionally, you can update the status of the donation based on verification
-    donation.status = "confirmed"
-    await donation.save()
+    await record_donation(donation)
     # Return the created donation object
     return donation
 
 
-async def retrieve_donations() -> List[Donation]:
-    donations = await Donation.all().to_list()
-    return donations
+async def retrieve_donations(
+    limit: Optional[int] = None, after: Optional[str] = None, fields: Optional[str] = None
+) -> Tuple[List[Donation], Optional[str]]:
+    return await paginate(Donation, limit=limit, after=after, fields=fields)
 
 async def retrieve_donations_by_user(user_id: PydanticObjectId) -> List[Donation]:
     donations = await Donation.find(Donation.user_id == user_id).to_list()
     return donations
 
 async def retrieve_donation(id: PydanticObjectId) -> Optional[Donation]:
-    donation = await Donation.get(id)
-    return donation
+    return await donation_cache.get(id, lambda: Donation.get(id))
 
 
 async def update_donation(id: PydanticObjectId, data: dict) -> Union[Donation, bool]:
@@ -46,29 +61,106 @@ async def update_donation(id: PydanticObjectId, data: dict) -> Union[Donation, b
     if not donation:
         return False
     update_data = {k: v for k, v in data.items() if v is not None}
+    previous = donation.model_copy()
     await donation.update({"$set": update_data})
+    await donation_cache.invalidate(id)
+    await replace_donation(previous, donation)
     return donation
 
 
+async def reverify_pending_donations() -> dict:
+    """
+    Verify again the donations left pending because the RPC endpoint was
+    unreachable, so confirmed ones start counting towards the rollups.
+    Returns how many donations ended up in each status.
+    """
+    counts = {"confirmed": 0, "failed": 0, "pending": 0}
+    async for donation in Donation.find(Donation.status == "pending"):
+        try:
+            status = await _verified_status(donation.tx_signature)
+        except ValueError:
+            status = "failed"
+        counts[status] += 1
+        if status == "pending":
+            continue
+        previous = donation.model_copy()
+        await donation.update({"$set": {"status": status}})
+        await donation_cache.invalidate(donation.id)
+        await replace_donation(previous, donation)
+    return counts
+
+
 async def delete_donation(id: PydanticObjectId) -> bool:
     donation = await Donation.get(id)
     if not donation:
         return False
     await donation.delete()
+    await donation_cache.invalidate(id)
+    await remove_donation(donation)
     return True
     
-async def retrieve_donations_done_by_user(user_id: PydanticObjectId) -> List[Donation]:
+async def retrieve_donation_totals_by_user(
+    user_id: PydanticObjectId, by_charity: bool = False, by_month: bool = False
+) -> List[dict]:
+    """
+    Sum a user's donations inside MongoDB, grouped by currency and optionally
+    by charity and by month (YYYY-MM of the donation timestamp).
+    """
+    group_id = {"currency": "$currency"}
+    if by_charity:
+        group_id["charity_id"] = "$charity_id"
+    if by_month:
+        group_id["month"] = {"$dateToString": {"format": "%Y-%m", "date": "$timestamp"}}
+    pipeline = [
+        {"$group": {
+            "_id": group_id,
+            "total_amount": {"$sum": "$amount"},
+            "donation_count": {"$sum": 1},
+        }},
+        {"$sort": {f"_id.{key}": 1 for key in group_id}},
+    ]
+    rows = await Donation.find(Donation.user_id == str(user_id)).aggregate(pipeline).to_list()
+    return [
+        {**row["_id"], "total_amount": row["total_amount"], "donation_count": row["donation_count"]}
+        for row in rows
+    ]
+
+
+async def retrieve_donations_done_by_user(
+    user_id: PydanticObjectId,
+    by_charity: bool = False,
+    by_month: bool = False,
+    include_donations: bool = False,
+) -> dict:
     """
-    Retrieve all donations made by a specific user.
+    Retrieve the donation totals of a specific user. The individual donation
+    documents are only loaded when include_donations is set.
     """
-    donations = await Donation.find(Donation.user_id == str(user_id)).to_list()
-    donation_amount = sum(donation.amount for donation in donations)
-    return donations, donation_amount
+    totals = await retrieve_donation_totals_by_user(user_id, by_charity, by_month)
+    summary = {
+        "totals": totals,
+        "total_amount": sum(row["total_amount"] for row in totals),
+        "donation_count": sum(row["donation_count"] for row in totals),
+    }
+    if include_donations:
+        summary["donations"] = await Donation.find(Donation.user_id == str(user_id)).to_list()
+    return summary
 
-async def retrieve_donations_history(user_id: PydanticObjectId) -> List[Donation]:
+async def retrieve_donations_history(
+    user_id: PydanticObjectId,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Tuple[List[Donation], Optional[str]]:
     """
-    Retrieve the donation history of a specific user.
+    Retrieve the donation history of a specific user, newest first.
     """
-    print(f"Retrieving donations for user_id: {user_id}")
-    donations = await Donation.find(Donation.user_id == str(user_id)).to_list()
-    return donations
\ No newline at end of file
+    return await paginate(
+        Donation,
+        {"user_id": str(user_id)},
+        limit=limit,
+        after=after,
+        fields=fields,
+        sort_field="timestamp",
+        descending=True,
+    )
\ No newline at end of file
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Type
+from beanie import Document
+from bson import ObjectId
+from config.config import Settings
+
+settings = Settings()
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+DONATION_EXPORT_FIELDS = [
+    "_id", "donor_wallet", "tx_signature", "amount", "currency",
+    "timestamp", "status", "charity_id", "user_id", "message",
+]
+
+ALERT_EXPORT_FIELDS = [
+    "_id", "alert_id", "message", "location", "city", "related_request_id",
+    "timestamp", "source", "missing_persons_reported", "details", "aid_available",
+]
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Cannot export value of type {type(value).__name__}")
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def export_media_type(fmt: str) -> str:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}. Use one of {', '.join(EXPORT_FORMATS)}.")
+    return EXPORT_FORMATS[fmt]
+
+
+def build_export_filter(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    date_field: str = "timestamp",
+    **equals,
+) -> dict:
+    """
+    Mongo filter for an export: a half-open [start, end) date range plus exact
+    matches for every keyword that is not None.
+    """
+    filters = {field: value for field, value in equals.items() if value is not None}
+    date_range = {}
+    if start:
+        date_range["$gte"] = start
+    if end:
+        date_range["$lt"] = end
+    if date_range:
+        filters[date_field] = date_range
+    return filters
+
+
+async def stream_export(
+    model: Type[Document], filters: dict, fields: List[str], fmt: str
+) -> AsyncIterator[str]:
+    """
+    Iterate a Motor cursor in batches of export_batch_size and yield the
+    NDJSON lines or CSV rows one batch at a time, so memory stays flat no
+    matter how large the collection is.
+    """
+    export_media_type(fmt)
+    cursor = model.get_motor_collection().find(
+        filters, {field: 1 for field in fields}, batch_size=settings.export_batch_size
+    ).sort("_id", 1)
+
+    if fmt == "csv":
+        rows = 0
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        async for document in cursor:
+            writer.writerow([_csv_cell(document.get(field)) for field in fields])
+            rows += 1
+            if rows % settings.export_batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        lines = []
+        async for document in cursor:
+            row = {field: document.get(field) for field in fields}
+            lines.append(json.dumps(row, default=_json_default) + "\n")
+            if len(lines) == settings.export_batch_size:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
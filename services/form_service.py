@@ -1,32 +1,117 @@
-from typing import Optional
+from typing import List, Optional, Tuple
 from beanie import PydanticObjectId
-from models.form import Form, Message
-
-
-async def create_form(alert_id: str) -> Form:
-    form = Form(alert_id=alert_id)
-    await form.create()
-    return form
+from pymongo import ASCENDING
+from models.form import Form, ForumParticipation, Message
+from services.forum_hub import forum_hub
+from services.pagination import paginate
 
 
 async def get_form_by_alert(alert_id: str) -> Optional[Form]:
     return await Form.find_one(Form.alert_id == alert_id)
 
 
-async def add_message_to_form(alert_id: str, message_data: dict) -> Optional[Form]:
-    form = await get_form_by_alert(alert_id)
-    if not form:
-        form = await create_form(alert_id)
+async def get_form_version(alert_id: str) -> Optional[dict]:
+    """
+    The _id, version and updated_at of an alert's form, without loading its
+    messages. Enough to tell whether a client's copy is current.
+    """
+    return await Form.get_motor_collection().find_one(
+        {"alert_id": alert_id}, projection={"version": 1, "updated_at": 1}
+    )
+
+
+async def add_message_to_form(alert_id: str, message_data: dict) -> Message:
+    """
+    Post a message to an alert's form, creating the form on the first post.
+    Returns only the new message.
+    """
+    message = await Form.append_message(alert_id, Message(**message_data))
+    await ForumParticipation.record_post(alert_id, message)
+    # Push to the alert's live subscribers once the message is stored
+    await forum_hub.publish(alert_id, message.model_dump(mode="json"))
+    return message
+
+
+async def merge_duplicate_forms(database) -> int:
+    """
+    Fold forms that share an alert_id into the oldest one, keeping every
+    message in timestamp order, then replace the old non-unique alert_id
+    index with the unique one. Must run once on a database that predates
+    the unique index: initiate_database can't build it over duplicates or
+    next to an index on the same key. Returns the number of forms removed.
+    """
+    collection = database[Form.Settings.name]
+    pipeline = [
+        {"$group": {"_id": "$alert_id", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    removed = 0
+    async for group in collection.aggregate(pipeline):
+        forms = await collection.find({"_id": {"$in": group["ids"]}}).sort("created_at", 1).to_list(None)
+        keep, duplicates = forms[0], forms[1:]
+        messages = sorted(
+            (message for form in forms for message in form.get("messages", [])),
+            key=lambda message: message["timestamp"],
+        )
+        await collection.update_one(
+            {"_id": keep["_id"]},
+            {"$set": {
+                "messages": messages,
+                "updated_at": max(form.get("updated_at") or keep["created_at"] for form in forms),
+            }},
+        )
+        result = await collection.delete_many({"_id": {"$in": [form["_id"] for form in duplicates]}})
+        removed += result.deleted_count
+
+    # Same key as alert_id_unique, MongoDB refuses a second index on it
+    if "alert_id_1" in await collection.index_information():
+        await collection.drop_index("alert_id_1")
+    await collection.create_index([("alert_id", ASCENDING)], unique=True, name="alert_id_unique")
+    return removed
+
+
+async def get_active_form_by_user(
+    user_id: PydanticObjectId,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Tuple[List[ForumParticipation], Optional[str]]:
+    """
+    Retrieve the forums a user has posted in, most recently active first,
+    one page at a time. Each entry is the user's participation summary
+    (alert_id, first/last post time, message count), not the form itself.
+    """
+    return await paginate(
+        ForumParticipation,
+        {"user_id": str(user_id)},
+        limit=limit,
+        after=after,
+        fields=fields,
+        sort_field="last_posted_at",
+        descending=True,
+    )
 
-    message = Message(**message_data)
-    await form.add_message(message)
-    return form
 
-async def get_active_form_by_user(user_id: PydanticObjectId) -> Optional[Form]:
+async def rebuild_forum_participation() -> int:
     """
-    Retrieve the active form for a user.
+    Recompute the participation rows from the messages stored on the forms,
+    for the initial backfill. Returns the number of rows written.
     """
-    # write a query to find the form by user_id in any of the messages, message is a list of Message objects
-    forms = Form.find({"messages.user_id": user_id}).skip(0).limit(100)
-    # return all
-    return await forms.to_list() if forms else None 
+    pipeline = [
+        {"$unwind": "$messages"},
+        {"$group": {
+            "_id": {"user_id": "$messages.user_id", "alert_id": "$alert_id"},
+            "first_posted_at": {"$min": "$messages.timestamp"},
+            "last_posted_at": {"$max": "$messages.timestamp"},
+            "message_count": {"$sum": 1},
+        }},
+    ]
+    rows = [
+        {**row["_id"], **{key: value for key, value in row.items() if key != "_id"}}
+        async for row in Form.get_motor_collection().aggregate(pipeline)
+    ]
+    collection = ForumParticipation.get_motor_collection()
+    await collection.delete_many({})
+    if rows:
+        await collection.insert_many(rows)
+    return len(rows)
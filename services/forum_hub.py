@@ -0,0 +1,138 @@
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Set
+from config.config import Settings
+from models.form import ForumEvent
+
+settings = Settings()
+
+
+class ForumBackend(ABC):
+    """
+    Carries published forum messages to the hub of every worker, including
+    the one that published them.
+    """
+
+    def __init__(self):
+        self.hub: Optional["ForumHub"] = None
+
+    def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, alert_id: str, message: dict) -> None:
+        ...
+
+
+class LocalForumBackend(ForumBackend):
+    """
+    Delivers straight to this process's subscribers. Enough for a single worker.
+    """
+
+    async def publish(self, alert_id: str, message: dict) -> None:
+        self.hub.deliver(alert_id, message)
+
+
+class MongoForumBackend(ForumBackend):
+    """
+    Writes each message to forum_events and delivers what the collection's
+    change stream reports, so all workers see every message. Change streams
+    need MongoDB running as a replica set.
+    """
+
+    def __init__(self, retry_after: float = 5.0):
+        super().__init__()
+        self._retry_after = retry_after
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def publish(self, alert_id: str, message: dict) -> None:
+        await ForumEvent(alert_id=alert_id, message=message).insert()
+
+    async def _listen(self):
+        resume_after = None
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        while True:
+            try:
+                async with ForumEvent.get_motor_collection().watch(
+                    pipeline, resume_after=resume_after
+                ) as stream:
+                    async for change in stream:
+                        resume_after = stream.resume_token
+                        event = change["fullDocument"]
+                        self.hub.deliver(event["alert_id"], event["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Forum change stream interrupted: {e}")
+                await asyncio.sleep(self._retry_after)
+
+
+class ForumHub:
+    """
+    In-process pub/sub of forum messages per alert_id. Each WebSocket client
+    gets a bounded queue; a client that falls behind loses its oldest
+    undelivered messages rather than holding memory for everyone.
+    """
+
+    def __init__(self, backend: ForumBackend, queue_size: int):
+        self._backend = backend
+        self._backend.hub = self
+        self._queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def start(self):
+        self._backend.start()
+
+    async def stop(self):
+        await self._backend.stop()
+
+    async def publish(self, alert_id: str, message: dict) -> None:
+        await self._backend.publish(alert_id, message)
+
+    def deliver(self, alert_id: str, message: dict) -> None:
+        for queue in self._subscribers.get(alert_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    @asynccontextmanager
+    async def subscribe(self, alert_id: str):
+        queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.setdefault(alert_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(alert_id)
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[alert_id]
+
+    def subscriber_count(self, alert_id: Optional[str] = None) -> int:
+        if alert_id is not None:
+            return len(self._subscribers.get(alert_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+FORUM_BACKENDS = {
+    "local": LocalForumBackend,
+    "mongo": MongoForumBackend,
+}
+
+forum_hub = ForumHub(
+    backend=FORUM_BACKENDS[settings.forum_pubsub_backend](),
+    queue_size=settings.forum_subscriber_queue_size,
+)
@@ -0,0 +1,81 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+from beanie import Document
+from fastapi import Request, Response
+
+# Cache-Control values shared by the read routes
+NO_CACHE = "no-cache"  # Clients may keep the body but must revalidate it on every use
+
+
+def version_etag(*parts) -> str:
+    """
+    Strong ETag over whatever identifies a representation's version, e.g.
+    document ids with their version counters and the page cursor.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return f'"{hashlib.sha1(payload.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def items_etag(items: Iterable, *extra) -> str:
+    """
+    ETag of a list of documents: their id and version when they are full
+    documents, or their content when they are projected dicts, which may
+    not carry the version field.
+    """
+    parts = [
+        (str(item.id), getattr(item, "version", None)) if isinstance(item, Document) else item
+        for item in items
+    ]
+    return version_etag(parts, *extra)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive datetimes in this codebase are UTC, HTTP dates have second precision
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since when both are sent
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            # A "-0000" zone parses to a naive datetime, which is UTC as well
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(last_modified) <= since
+    return False
+
+
+def conditional(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str = NO_CACHE,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """
+    Set the validators and Cache-Control on a read route's response. Returns
+    a 304 response to send instead of the body when the client's copy is
+    current, None when the route should build its body as usual.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
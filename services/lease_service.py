@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+from pymongo.errors import DuplicateKeyError
+from models.lease import Lease
+
+
+def new_lease_owner() -> str:
+    return uuid4().hex
+
+
+async def acquire_lease(key: str, owner: str, ttl: timedelta) -> bool:
+    """
+    Try to take the named lease. Succeeds if nobody holds it, the previous
+    holder's lease expired, or `owner` already holds it (renewal).
+    """
+    now = datetime.utcnow()
+    try:
+        await Lease.get_motor_collection().find_one_and_update(
+            {"key": key, "$or": [{"expires_at": {"$lt": now}}, {"owner": owner}]},
+            {"$set": {"owner": owner, "expires_at": now + ttl}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # The lease document exists and is held by someone else
+        return False
+    return True
+
+
+async def release_lease(key: str, owner: str) -> None:
+    await Lease.get_motor_collection().delete_one({"key": key, "owner": owner})
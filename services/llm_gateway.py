@@ -0,0 +1,131 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+import google.generativeai as genai
+from config.config import Settings
+
+T = TypeVar("T")
+
+settings = Settings()
+genai.configure(api_key=settings.genai_api_key)
+
+
+class LLMGateway:
+    """
+    Single entry point for Gemini calls. Uses the native async API so no
+    request blocks the event loop, caps the number of calls in flight,
+    applies a per-call timeout and keeps queueing metrics.
+    """
+
+    def __init__(self, model_name: str, max_in_flight: int, timeout: float):
+        self.model = genai.GenerativeModel(model_name)
+        self._max_in_flight = max_in_flight
+        self._timeout = timeout
+        # Created on first use so it binds to the server's event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._queued = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_latency = 0.0
+
+    @asynccontextmanager
+    async def _slot(self):
+        """
+        Wait for a free slot and hold it for the duration of one call.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_in_flight)
+        queued_at = time.monotonic()
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+        wait = time.monotonic() - queued_at
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+        self._in_flight += 1
+        started_at = time.monotonic()
+        try:
+            yield
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        else:
+            self._completed += 1
+        finally:
+            self._in_flight -= 1
+            self._total_latency += time.monotonic() - started_at
+            self._semaphore.release()
+
+    async def _run(self, call: Callable[[], Awaitable[T]]) -> T:
+        async with self._slot():
+            return await asyncio.wait_for(call(), timeout=self._timeout)
+
+    async def generate(self, prompt, model: Optional[genai.GenerativeModel] = None):
+        model = model or self.model
+        return await self._run(lambda: model.generate_content_async(prompt))
+
+    async def chat(
+        self,
+        history: List[Dict],
+        message: str,
+        model: Optional[genai.GenerativeModel] = None,
+    ):
+        chat = (model or self.model).start_chat(history=history)
+        return await self._run(lambda: chat.send_message_async(message))
+
+    async def stream_chat(
+        self,
+        history: List[Dict],
+        message: str,
+        model: Optional[genai.GenerativeModel] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the reply text chunk by chunk as Gemini generates it. The slot is
+        held until the stream ends and the timeout applies to each chunk.
+        """
+        chat = (model or self.model).start_chat(history=history)
+        async with self._slot():
+            response = await asyncio.wait_for(
+                chat.send_message_async(message, stream=True), timeout=self._timeout
+            )
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self._timeout)
+                except StopAsyncIteration:
+                    break
+                if chunk.text:
+                    yield chunk.text
+
+    def metrics(self) -> dict:
+        finished = self._completed + self._failed + self._timed_out
+        return {
+            "max_in_flight": self._max_in_flight,
+            "timeout_seconds": self._timeout,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timed_out": self._timed_out,
+            "avg_wait_seconds": self._total_wait / finished if finished else 0.0,
+            "max_wait_seconds": self._max_wait,
+            "avg_latency_seconds": self._total_latency / finished if finished else 0.0,
+        }
+
+
+llm_gateway = LLMGateway(
+    model_name=settings.llm_model_name,
+    max_in_flight=settings.llm_max_in_flight,
+    timeout=settings.llm_timeout_seconds,
+)
@@ -0,0 +1,140 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple, Type
+from beanie import Document, PydanticObjectId
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from config.config import Settings
+
+settings = Settings()
+
+
+def _encode_value(value) -> dict:
+    # Tagged so the value comes back with the type the keyset query compares against
+    if value is None:
+        return {"t": "none"}
+    if isinstance(value, datetime):
+        return {"t": "date", "v": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"t": "oid", "v": str(value)}
+    if isinstance(value, bool):
+        return {"t": "bool", "v": value}
+    if isinstance(value, int):
+        return {"t": "int", "v": value}
+    if isinstance(value, float):
+        return {"t": "float", "v": value}
+    return {"t": "str", "v": str(value)}
+
+
+def _decode_value(value: dict):
+    tag = value["t"]
+    if tag == "none":
+        return None
+    if tag == "date":
+        return datetime.fromisoformat(value["v"])
+    if tag == "oid":
+        return PydanticObjectId(value["v"])
+    decoders = {"bool": bool, "int": int, "float": float, "str": str}
+    return decoders[tag](value["v"])
+
+
+def encode_cursor(sort_value, doc_id) -> str:
+    """
+    Opaque cursor holding the sort key and _id of the last item of a page.
+    """
+    payload = json.dumps({"s": _encode_value(sort_value), "id": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[object, PydanticObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return _decode_value(payload["s"]), PydanticObjectId(payload["id"])
+    except Exception:
+        raise ValueError("Invalid pagination cursor.")
+
+
+def parse_fields(model: Type[Document], fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma separated `fields=` query value into a projection list,
+    rejecting names the model does not have.
+    """
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [
+        name for name in names
+        if name.split(".")[0] not in model.model_fields and name not in ("_id", "id")
+    ]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ["_id" if name == "id" else name for name in names]
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return settings.default_page_size
+    return min(limit, settings.max_page_size)
+
+
+async def paginate(
+    model: Type[Document],
+    filters: Optional[dict] = None,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort_field: str = "_id",
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    Keyset pagination shared by the list services.
+
+    Items are ordered by (sort_field, _id) and the page after `after` is read
+    with a range query instead of skip, so every page costs the same. When
+    `fields` is given the projection is pushed down to Mongo and plain dicts
+    are returned instead of documents. Returns (items, next_cursor).
+    """
+    limit = clamp_limit(limit)
+    query = dict(filters or {})
+    direction = DESCENDING if descending else ASCENDING
+    op = "$lt" if descending else "$gt"
+
+    if after:
+        sort_value, last_id = decode_cursor(after)
+        if sort_field == "_id":
+            keyset = {"_id": {op: last_id}}
+        else:
+            keyset = {"$or": [
+                {sort_field: {op: sort_value}},
+                {sort_field: sort_value, "_id": {op: last_id}},
+            ]}
+        query = {"$and": [query, keyset]} if query else keyset
+
+    sort = [(sort_field, direction)]
+    if sort_field != "_id":
+        sort.append(("_id", direction))
+
+    projection = parse_fields(model, fields)
+    if projection is None:
+        items = await model.find(query).sort(sort).limit(limit + 1).to_list()
+        rows = [(getattr(item, sort_field, None), item.id) for item in items]
+    else:
+        # The sort key is needed for the cursor even when it wasn't asked for
+        strip_sort_field = sort_field != "_id" and sort_field not in projection
+        projection = {name: 1 for name in projection + [sort_field]}
+        cursor = model.get_motor_collection().find(query, projection).sort(sort).limit(limit + 1)
+        items = await cursor.to_list(length=limit + 1)
+        rows = [(item.get(sort_field), item["_id"]) for item in items]
+        for item in items:
+            item["_id"] = str(item["_id"])
+            if strip_sort_field:
+                item.pop(sort_field, None)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        sort_value, last_id = rows[limit - 1]
+        next_cursor = encode_cursor(None if sort_field == "_id" else sort_value, last_id)
+    return items, next_cursor
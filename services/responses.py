@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+class ModelResponse(Response):
+    """
+    JSON response rendered straight from a typed pydantic model by its
+    compiled serializer. Returning it from a route skips FastAPI's response
+    validation and the generic jsonable_encoder walk over every document.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json(by_alias=True).encode("utf-8")
@@ -0,0 +1,157 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from beanie import PydanticObjectId
+from pymongo import UpdateOne
+from models.donation import Donation, DonationRollup
+from services.charity_service import retrieve_charity
+
+ROLLUP_DIMENSIONS = ("charity", "alert", "currency", "day")
+
+# Only verified donations count towards funding totals. Pending ones join
+# once reverify_pending_donations confirms them, failed ones never do.
+COUNTED_STATUSES = ("confirmed",)
+
+
+async def _alert_id_for_charity(charity_id: Optional[str]) -> Optional[str]:
+    if not charity_id:
+        return None
+    try:
+        charity = await retrieve_charity(PydanticObjectId(charity_id))
+    except Exception:
+        return None
+    return charity.alert_id if charity else None
+
+
+async def _rollup_keys(donation: Donation) -> List[Tuple[str, str, str]]:
+    """
+    The (dimension, key, currency) rows a donation contributes to.
+    """
+    if donation.status not in COUNTED_STATUSES:
+        return []
+    keys = [
+        ("currency", donation.currency, donation.currency),
+        ("day", donation.timestamp.strftime("%Y-%m-%d"), donation.currency),
+    ]
+    if donation.charity_id:
+        keys.append(("charity", donation.charity_id, donation.currency))
+        alert_id = await _alert_id_for_charity(donation.charity_id)
+        if alert_id:
+            keys.append(("alert", alert_id, donation.currency))
+    return keys
+
+
+async def _apply(deltas: Dict[Tuple[str, str, str], Tuple[float, int]]) -> None:
+    operations = [
+        UpdateOne(
+            {"dimension": dimension, "key": key, "currency": currency},
+            {
+                "$inc": {"total_amount": amount, "donation_count": count},
+                "$set": {"updated_at": datetime.utcnow()},
+            },
+            upsert=True,
+        )
+        for (dimension, key, currency), (amount, count) in deltas.items()
+        if amount or count
+    ]
+    if operations:
+        await DonationRollup.get_motor_collection().bulk_write(operations, ordered=False)
+
+
+async def _deltas(donation: Donation, sign: int, deltas: dict) -> dict:
+    for rollup_key in await _rollup_keys(donation):
+        amount, count = deltas.get(rollup_key, (0, 0))
+        deltas[rollup_key] = (amount + sign * donation.amount, count + sign)
+    return deltas
+
+
+async def record_donation(donation: Donation) -> None:
+    await _apply(await _deltas(donation, 1, {}))
+
+
+async def remove_donation(donation: Donation) -> None:
+    await _apply(await _deltas(donation, -1, {}))
+
+
+async def replace_donation(old: Donation, new: Donation) -> None:
+    """
+    Move a donation's contribution from its old values to its new ones in one
+    bulk write, e.g. after its amount, currency or charity changed.
+    """
+    deltas = await _deltas(old, -1, {})
+    await _apply(await _deltas(new, 1, deltas))
+
+
+async def retrieve_rollups(
+    dimension: str, currency: Optional[str] = None, limit: int = 10
+) -> List[DonationRollup]:
+    """
+    Largest rollup rows of a dimension first, e.g. the top charities by amount.
+    """
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise ValueError(f"Unknown rollup dimension: {dimension}. Use one of {', '.join(ROLLUP_DIMENSIONS)}.")
+    query = {"dimension": dimension, "donation_count": {"$gt": 0}}
+    if currency:
+        query["currency"] = currency
+    sort = [("key", -1)] if dimension == "day" else [("total_amount", -1)]
+    return await DonationRollup.find(query).sort(sort).limit(limit).to_list()
+
+
+async def rebuild_rollups() -> int:
+    """
+    Recompute every rollup row from the donations collection. Used for the
+    initial backfill, and to repair the alert rollups after a charity was
+    moved to another alert. Returns the number of rollup rows written.
+    """
+    match = {"$match": {"status": {"$in": list(COUNTED_STATUSES)}}}
+    group_by = {
+        "currency": "$currency",
+        "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+        "charity": "$charity_id",
+    }
+    totals = defaultdict(lambda: [0, 0])
+    for dimension, key in group_by.items():
+        pipeline = [
+            match,
+            {"$group": {
+                "_id": {"key": key, "currency": "$currency"},
+                "total_amount": {"$sum": "$amount"},
+                "donation_count": {"$sum": 1},
+            }},
+        ]
+        async for row in Donation.get_motor_collection().aggregate(pipeline):
+            if row["_id"]["key"] is None:
+                continue
+            rollup = totals[(dimension, row["_id"]["key"], row["_id"]["currency"])]
+            rollup[0] += row["total_amount"]
+            rollup[1] += row["donation_count"]
+
+    # Alert totals are the charity totals regrouped by Charity.alert_id
+    charity_alerts = {}
+    for (dimension, key, currency), (amount, count) in list(totals.items()):
+        if dimension != "charity":
+            continue
+        if key not in charity_alerts:
+            charity_alerts[key] = await _alert_id_for_charity(key)
+        if charity_alerts[key]:
+            rollup = totals[("alert", charity_alerts[key], currency)]
+            rollup[0] += amount
+            rollup[1] += count
+
+    now = datetime.utcnow()
+    collection = DonationRollup.get_motor_collection()
+    await collection.delete_many({})
+    rows = [
+        {
+            "dimension": dimension,
+            "key": key,
+            "currency": currency,
+            "total_amount": amount,
+            "donation_count": count,
+            "updated_at": now,
+        }
+        for (dimension, key, currency), (amount, count) in totals.items()
+    ]
+    if rows:
+        await collection.insert_many(rows)
+    return len(rows)
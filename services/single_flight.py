@@ -0,0 +1,31 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one in-flight execution.
+    Every caller awaiting a key while it runs receives the same result.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+
+            def _forget(done: asyncio.Future):
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+
+            call.add_done_callback(_forget)
+        # A cancelled waiter must not cancel the call shared with the others
+        return await asyncio.shield(call)
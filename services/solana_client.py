@@ -0,0 +1,98 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, Optional, TypeVar
+import httpx
+from solana.exceptions import SolanaRpcException
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
+from config.config import Settings
+
+T = TypeVar("T")
+
+settings = Settings()
+
+# Errors an RPC call can fail with, only some of them are worth another attempt
+RPC_ERRORS = (SolanaRpcException, httpx.HTTPError, asyncio.TimeoutError)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Timeouts, connection failures, 429s and 5xx are transient. Other HTTP
+    errors, e.g. 400 or 403, fail the same way on every attempt.
+    """
+    if isinstance(error, SolanaRpcException) and error.__cause__ is not None:
+        # solana-py wraps the httpx error it got
+        error = error.__cause__
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+class SolanaRPC:
+    """
+    One long-lived AsyncClient per process. Its HTTP session keeps
+    connections to the RPC endpoint alive, so a verification costs a request
+    rather than a TCP and TLS handshake. Calls are retried with exponential
+    backoff and jitter when they fail transiently.
+    """
+
+    def __init__(self, endpoint: str, timeout: float, max_retries: int, backoff: float):
+        self._endpoint = endpoint
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._client: Optional[AsyncClient] = None
+
+    @property
+    def client(self) -> AsyncClient:
+        # Created on first use outside the app, e.g. from manage.py
+        if self._client is None:
+            self.start()
+        return self._client
+
+    def start(self):
+        if self._client is None:
+            self._client = AsyncClient(self._endpoint, commitment=Confirmed, timeout=self._timeout)
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def _call(self, request: Callable[[AsyncClient], Awaitable[T]]) -> T:
+        for attempt in range(self._max_retries + 1):
+            try:
+                return await request(self.client)
+            except RPC_ERRORS as e:
+                if attempt == self._max_retries or not is_retryable(e):
+                    raise
+                delay = self._backoff * 2 ** attempt
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
+    async def transaction_confirmed(self, tx_signature: str) -> bool:
+        """
+        True if the transaction landed without error and is at least
+        confirmed. Raises ValueError for a malformed signature.
+        """
+        signature = Signature.from_string(tx_signature)
+        response = await self._call(
+            lambda client: client.get_signature_statuses([signature], search_transaction_history=True)
+        )
+        status = response.value[0]
+        if status is None or status.err is not None:
+            return False
+        return status.confirmation_status in (
+            TransactionConfirmationStatus.Confirmed,
+            TransactionConfirmationStatus.Finalized,
+        )
+
+
+solana_rpc = SolanaRPC(
+    endpoint=settings.solana_rpc_url,
+    timeout=settings.solana_rpc_timeout_seconds,
+    max_retries=settings.solana_rpc_max_retries,
+    backoff=settings.solana_rpc_backoff_seconds,
+)
@@ -1,6 +1,9 @@
 from typing import List, Union
-from beanie import PydanticObjectId
+from beanie import PydanticObjectId, UpdateResponse
 from models.user import User
+from services.cache import DocumentCache, cache_backend
+
+user_cache = DocumentCache(cache_backend, User)
 
 
 async def add_user(new_user: User) -> User:
@@ -14,22 +17,23 @@ async def retrieve_users() -> List[User]:
 
 
 async def retrieve_user(id: PydanticObjectId) -> Union[User, None]:
-    user = await User.get(id)
-    return user
+    return await user_cache.get(id, lambda: User.get(id))
 
 
 async def update_user_data(id: PydanticObjectId, data: dict) -> Union[User, bool]:
-    user = await User.get(id)
+    update_data = {k: v for k, v in data.items() if v is not None}
+    user = await User.find_one(User.id == id).update(
+        {"$set": update_data}, response_type=UpdateResponse.NEW_DOCUMENT
+    )
     if not user:
         return False
-    update_data = {k: v for k, v in data.items() if v is not None}
-    await user.update({"$set": update_data})
+    await user_cache.invalidate(id)
     return user
 
 
 async def delete_user(id: PydanticObjectId) -> bool:
-    user = await User.get(id)
-    if not user:
+    result = await User.find_one(User.id == id).delete()
+    if not result or not result.deleted_count:
         return False
-    await user.delete()
+    await user_cache.invalidate(id)
     return True
@@ -41,6 +41,24 @@ async def client_test(mocker):
             yield ac
 
 
+@pytest.fixture
+async def database():
+    """
+    Fresh in-memory database per test, without running the app's startup.
+    """
+    await mock_database()
+
+
+@pytest.fixture
+async def api_client(database):
+    """
+    HTTP client against the app on the in-memory database. Lifespan hooks
+    are skipped, they would connect to the real database and RPC endpoints.
+    """
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        yield ac
+
+
 @pytest.fixture
 def anyio_backend():
     return "asyncio"
@@ -0,0 +1,47 @@
+import pytest
+from httpx import AsyncClient
+
+from models.alert_chat import AlertChat
+
+URL = "/alerts/chat/chat/alert-1"
+
+
+async def post_messages(count: int) -> None:
+    for index in range(count):
+        await AlertChat.append_message("alert-1", "u1", "user", f"message {index}")
+
+
+class TestChatHistoryConditional:
+    @pytest.mark.anyio
+    async def test_not_modified_until_a_message_is_added(self, api_client: AsyncClient):
+        await post_messages(3)
+        response = await api_client.get(URL, params={"user_id": "u1"})
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "private, no-cache"
+        etag = response.headers["etag"]
+
+        response = await api_client.get(URL, params={"user_id": "u1"}, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        await post_messages(1)
+        response = await api_client.get(URL, params={"user_id": "u1"}, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["last_seq"] == 4
+
+    @pytest.mark.anyio
+    async def test_etag_covers_the_page_parameters(self, api_client: AsyncClient):
+        await post_messages(5)
+        response = await api_client.get(URL, params={"user_id": "u1", "limit": 2})
+        etag = response.headers["etag"]
+
+        for params in ({"limit": 3}, {"limit": 2, "before": 4}, {"after": 2}, {"since": "2024-01-01T00:00:00"}, {}):
+            response = await api_client.get(
+                URL, params={"user_id": "u1", **params}, headers={"If-None-Match": etag}
+            )
+            assert response.status_code == 200, params
+            assert response.headers["etag"] != etag
+
+        response = await api_client.get(
+            URL, params={"user_id": "u1", "limit": 2}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
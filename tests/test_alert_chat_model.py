@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from models.alert_chat import AlertChat, AlertChatMessage
+
+LEGACY_MESSAGES = [
+    {"sender": "user", "message": "Is the bridge open?", "timestamp": datetime(2024, 6, 1, 8)},
+    {"sender": "ai", "message": "It is closed.", "timestamp": datetime(2024, 6, 1, 8, 1)},
+    {"role": "user", "content": "Thanks", "timestamp": datetime(2024, 6, 1, 8, 2)},
+]
+
+
+async def stored_messages(alert_id: str = "alert-1", user_id: str = "u1") -> list:
+    messages = await AlertChatMessage.find(
+        AlertChatMessage.alert_id == alert_id, AlertChatMessage.user_id == user_id
+    ).sort(AlertChatMessage.seq).to_list()
+    return [(message.seq, message.role, message.content) for message in messages]
+
+
+async def create_legacy_chat(**fields) -> dict:
+    document = {
+        "alert_id": "alert-1", "user_id": "u1", "messages": LEGACY_MESSAGES,
+        "created_at": datetime(2024, 6, 1, 8), "updated_at": datetime(2024, 6, 1, 8, 2), **fields,
+    }
+    await AlertChat.get_motor_collection().insert_one(document)
+    return document
+
+
+class TestAppendMessage:
+    @pytest.mark.anyio
+    async def test_reserves_consecutive_seqs(self, database):
+        for content in ("first", "second", "third"):
+            await AlertChat.append_message("alert-1", "u1", "user", content)
+        await AlertChat.append_message("alert-1", "u2", "user", "other user")
+
+        assert await stored_messages() == [(1, "user", "first"), (2, "user", "second"), (3, "user", "third")]
+        assert await stored_messages(user_id="u2") == [(1, "user", "other user")]
+        chat = await AlertChat.find_one(AlertChat.alert_id == "alert-1", AlertChat.user_id == "u1")
+        assert chat.message_count == 3
+        assert await AlertChat.find_all().count() == 2
+
+    @pytest.mark.anyio
+    async def test_concurrent_appends_get_distinct_seqs(self, database):
+        await asyncio.gather(*(
+            AlertChat.append_message("alert-1", "u1", "user", f"message {index}") for index in range(10)
+        ))
+
+        assert sorted(seq for seq, _, _ in await stored_messages()) == list(range(1, 11))
+        assert await AlertChat.find_all().count() == 1
+
+
+class TestLegacyMigration:
+    @pytest.mark.anyio
+    async def test_first_append_migrates_embedded_messages(self, database):
+        # A document from before chat_messages has no message_count
+        await create_legacy_chat()
+
+        await AlertChat.append_message("alert-1", "u1", "user", "Is it open now?")
+
+        assert await stored_messages() == [
+            (-2, "user", "Is the bridge open?"),
+            (-1, "ai", "It is closed."),
+            (0, "user", "Thanks"),
+            (1, "user", "Is it open now?"),
+        ]
+        chat = await AlertChat.get_motor_collection().find_one({"alert_id": "alert-1"})
+        assert chat["messages"] == []
+        assert chat["message_count"] == 1
+
+    @pytest.mark.anyio
+    async def test_repeated_migration_skips_copied_messages(self, database):
+        document = await create_legacy_chat()
+
+        await AlertChat.migrate_embedded_messages(document["_id"])
+        # A crash before the embedded messages were cleared leaves them behind
+        await AlertChat.get_motor_collection().update_one(
+            {"_id": document["_id"]}, {"$set": {"messages": LEGACY_MESSAGES}}
+        )
+        await AlertChat.migrate_embedded_messages(document["_id"])
+
+        assert [seq for seq, _, _ in await stored_messages()] == [-2, -1, 0]
+        chat = await AlertChat.get_motor_collection().find_one({"_id": document["_id"]})
+        assert chat["messages"] == []
+
+    @pytest.mark.anyio
+    async def test_migrated_chat_keeps_its_message_count(self, database):
+        await create_legacy_chat(message_count=4, messages=LEGACY_MESSAGES[:1])
+
+        await AlertChat.append_message("alert-1", "u1", "ai", "Reply")
+
+        assert await stored_messages() == [(0, "user", "Is the bridge open?"), (5, "ai", "Reply")]
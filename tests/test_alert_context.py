@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from models.alert import Alert
+from services import alert_context
+from services.alert_context import AlertContextStore
+
+
+async def create_alert(message: str = "Flooding along the river") -> Alert:
+    return await Alert(
+        alert_id="alert-1", message=message, location="global", related_request_id=None, meta={}
+    ).create()
+
+
+class TestAlertContextStore:
+    @pytest.fixture
+    def failing_remote_cache(self, mocker):
+        mocker.patch.object(alert_context.settings, "llm_context_cache_enabled", True)
+        return mocker.patch(
+            "google.generativeai.caching.CachedContent.create",
+            side_effect=RuntimeError("Cached content is too small"),
+        )
+
+    @pytest.mark.anyio
+    async def test_failed_remote_cache_is_not_retried_every_turn(self, database, failing_remote_cache):
+        await create_alert()
+        store = AlertContextStore(maxsize=16, ttl=300, retry_after=0.2)
+
+        for _ in range(3):
+            context = await store.get("alert-1")
+            assert context.cached_content is None
+            assert "Flooding along the river" in context.system_prompt
+        assert failing_remote_cache.call_count == 1
+
+        await asyncio.sleep(0.25)
+        await store.get("alert-1")
+        assert failing_remote_cache.call_count == 2
+
+    @pytest.mark.anyio
+    async def test_new_alert_version_is_cached_again(self, database, failing_remote_cache):
+        alert = await create_alert()
+        store = AlertContextStore(maxsize=16, ttl=300, retry_after=300)
+
+        await store.get("alert-1")
+        alert.message = "Flooding has reached the old town"
+        store.refresh(alert)
+        await store.get("alert-1")
+        assert failing_remote_cache.call_count == 2
+
+    @pytest.mark.anyio
+    async def test_unknown_alert(self, database):
+        store = AlertContextStore(maxsize=16, ttl=300, retry_after=300)
+
+        assert await store.get("missing") is None
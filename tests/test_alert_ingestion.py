@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+
+from models.alert import Alert
+from services.alert_ingestion import alert_fingerprint, refingerprint_alerts, upsert_alerts
+
+FLOOD = {
+    "title": "Flooding along the river",
+    "location": "Cologne",
+    "timestamp": "2024-06-01T08:00:00Z",
+    "details": ["Roads closed"],
+    "source": "DWD",
+}
+
+
+class TestAlertIngestion:
+    @pytest.mark.anyio
+    async def test_repeated_event_updates_one_alert(self, database):
+        assert await upsert_alerts([FLOOD], "global") == 1
+        assert await upsert_alerts([{**FLOOD, "source": "Reuters"}], "global") == 0
+
+        alerts = await Alert.find_all().to_list()
+        assert len(alerts) == 1
+        assert alerts[0].source == "Reuters"
+        assert alerts[0].version == 2
+
+    @pytest.mark.anyio
+    async def test_same_event_for_two_locations(self, database):
+        assert await upsert_alerts([FLOOD], "global") == 1
+        assert await upsert_alerts([FLOOD], "Germany") == 1
+        assert await upsert_alerts([FLOOD], "global") == 0
+
+        alerts = await Alert.find_all().to_list()
+        assert sorted(alert.location for alert in alerts) == ["Germany", "global"]
+        assert alerts[0].fingerprint != alerts[1].fingerprint
+        assert alerts[0].alert_id != alerts[1].alert_id
+
+    @pytest.mark.anyio
+    async def test_refingerprint_alerts(self, database):
+        await upsert_alerts([FLOOD], "Germany")
+        await Alert.get_motor_collection().update_many({}, {"$set": {"fingerprint": "legacy"}})
+
+        assert await refingerprint_alerts() == 1
+        alert = await Alert.find_one()
+        assert alert.fingerprint == alert_fingerprint(
+            FLOOD["title"], FLOOD["location"], datetime(2024, 6, 1, 8), "Germany"
+        )
+        assert await refingerprint_alerts() == 0
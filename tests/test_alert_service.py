@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pytest
+
+from models.alert import Alert
+from services import alert_service
+from services.alert_context import alert_context_store
+from services.chat_cache import ChatResponseCache, chat_response_cache
+from services.alert_ingestion import upsert_alerts
+
+FLOOD = {
+    "title": "Flooding along the river",
+    "location": "Cologne",
+    "timestamp": "2024-06-01T08:00:00Z",
+    "source": "DWD",
+}
+
+
+class TestAlertCacheInvalidation:
+    @pytest.mark.anyio
+    async def test_reload_invalidates_cached_alerts(self, database, mocker):
+        await upsert_alerts([FLOOD], "Germany")
+        alert_id = (await Alert.find_one()).alert_id
+        assert (await alert_service.retrieve_alert(alert_id)).source == "DWD"
+
+        mocker.patch.object(
+            alert_service, "fetch_alert_details_from_gemini", return_value=[{**FLOOD, "source": "Reuters"}]
+        )
+        await alert_service._load_alerts_from_gemini("Germany")
+
+        alert = await alert_service.retrieve_alert(alert_id)
+        assert alert.source == "Reuters"
+        assert alert.version == 2
+
+    @pytest.mark.anyio
+    async def test_reload_drops_chat_context_and_cached_replies(self, database, mocker):
+        await upsert_alerts([FLOOD], "Germany")
+        alert_id = (await Alert.find_one()).alert_id
+        context = await alert_context_store.get(alert_id)
+        key = ChatResponseCache.key(alert_id, context.version, "Is it safe?")
+        chat_response_cache.set(key, "Stay away from the river.")
+
+        mocker.patch.object(
+            alert_service, "fetch_alert_details_from_gemini",
+            return_value=[{**FLOOD, "details": ["The old town is flooded"]}],
+        )
+        await alert_service._load_alerts_from_gemini("Germany")
+
+        assert chat_response_cache.get(key) is None
+        context = await alert_context_store.get(alert_id)
+        assert "The old town is flooded" in context.system_prompt
+
+
+class TestReloadUnderLease:
+    @pytest.mark.anyio
+    async def test_skips_a_location_reloaded_in_the_meantime(self, database, mocker):
+        fetch = mocker.patch.object(alert_service, "fetch_alert_details_from_gemini", return_value=[FLOOD])
+
+        await alert_service.reload_alerts("Germany")
+        assert fetch.call_count == 1
+
+        # Queued while the first reload ran, finds the location fresh
+        alerts = await alert_service.reload_alerts("Germany")
+        assert fetch.call_count == 1
+        assert [alert.message for alert in alerts] == [FLOOD["title"]]
+
+    @pytest.mark.anyio
+    async def test_forced_reload_runs_on_a_fresh_location(self, database, mocker):
+        fetch = mocker.patch.object(alert_service, "fetch_alert_details_from_gemini", return_value=[FLOOD])
+
+        await alert_service.reload_alerts("Germany")
+        await alert_service.reload_alerts("Germany", force=True)
+        assert fetch.call_count == 2
+
+    @pytest.mark.anyio
+    async def test_stale_location_is_reloaded(self, database, mocker):
+        fetch = mocker.patch.object(alert_service, "fetch_alert_details_from_gemini", return_value=[FLOOD])
+        await alert_service.reload_alerts("Germany")
+        await alert_service.set_ingestion_status(
+            "Germany", "loaded", last_loaded=datetime(2020, 1, 1), last_attempted=datetime(2020, 1, 1)
+        )
+
+        await alert_service.reload_alerts("Germany")
+        assert fetch.call_count == 2
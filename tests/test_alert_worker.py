@@ -0,0 +1,86 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from services.alert_worker import AlertRefreshWorker
+
+
+async def always_stale(location):
+    return True
+
+
+class TestAlertRefreshWorker:
+    @pytest.mark.anyio
+    async def test_force_is_passed_to_the_refresh(self):
+        calls = []
+
+        async def refresh(location, force=False):
+            calls.append((location, force))
+
+        worker = AlertRefreshWorker(refresh, always_stale)
+        worker.start()
+        try:
+            assert worker.schedule("Berlin") is True
+            # Already pending, but the pending refresh becomes a forced one
+            assert worker.schedule("Berlin", force=True) is False
+            assert worker.schedule("Paris") is True
+            await asyncio.sleep(0.01)
+        finally:
+            await worker.stop()
+        assert calls == [("Berlin", True), ("Paris", False)]
+
+    def test_schedule_needs_a_running_worker(self):
+        async def refresh(location, force=False):
+            pass
+
+        assert AlertRefreshWorker(refresh, always_stale).schedule("Berlin") is False
+
+    @pytest.mark.anyio
+    async def test_sweep_refreshes_stale_requested_locations(self):
+        refreshed = []
+        stale = {"Berlin": True, "Paris": False}
+
+        async def refresh(location, force=False):
+            refreshed.append(location)
+
+        async def is_stale(location):
+            return stale[location]
+
+        worker = AlertRefreshWorker(
+            refresh, is_stale, refresh_after=timedelta(minutes=5), sweep_interval=timedelta(milliseconds=10)
+        )
+        worker.track("Berlin")
+        worker.track("Paris")
+        worker.start()
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            await worker.stop()
+        assert set(refreshed) == {"Berlin"}
+
+    @pytest.mark.anyio
+    async def test_locations_nobody_requests_are_forgotten(self):
+        refreshed = []
+
+        async def refresh(location, force=False):
+            refreshed.append(location)
+
+        worker = AlertRefreshWorker(
+            refresh, always_stale,
+            refresh_after=timedelta(milliseconds=20), sweep_interval=timedelta(milliseconds=50),
+        )
+        worker.track("Berlin")
+        worker.start()
+        try:
+            await asyncio.sleep(0.08)
+        finally:
+            await worker.stop()
+        assert refreshed == []
+
+    def test_tracked_locations_are_bounded(self):
+        worker = AlertRefreshWorker(always_stale, always_stale, max_locations=2)
+        for location in ("Berlin", "Paris", "Rome"):
+            worker.track(location)
+
+        assert set(worker._requested) == {"Paris", "Rome"}
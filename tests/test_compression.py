@@ -0,0 +1,150 @@
+import csv
+import gzip
+import io
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from middleware import CompressionMiddleware
+from models.alert import Alert
+
+try:
+    import brotli
+except ImportError:  # Optional, like in the middleware
+    brotli = None
+
+MINIMUM_SIZE = 100
+requires_brotli = pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+
+
+async def sized(request):
+    return PlainTextResponse("x" * int(request.query_params["size"]))
+
+
+async def encoded(request):
+    return Response(gzip.compress(b"y" * 500), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+
+async def streamed(request):
+    async def rows():
+        for index in range(3):
+            yield f"row {index}\n" * 10
+
+    return StreamingResponse(rows(), media_type="text/plain")
+
+
+async def events(request):
+    return Response("data: x\n\n" * 50, media_type="text/event-stream")
+
+
+async def excluded(request):
+    return PlainTextResponse("z" * 500)
+
+
+test_app = CompressionMiddleware(
+    Starlette(routes=[
+        Route("/sized", sized),
+        Route("/encoded", encoded),
+        Route("/streamed", streamed),
+        Route("/events", events),
+        Route("/excluded/path", excluded),
+    ]),
+    minimum_size=MINIMUM_SIZE,
+    exclude_paths=["/excluded"],
+)
+
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(app=test_app, base_url="http://test") as ac:
+        yield ac
+
+
+async def get_raw(client: AsyncClient, url: str, accept_encoding: str = "gzip"):
+    # Read the body as sent, httpx would otherwise decode it
+    async with client.stream("GET", url, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join([chunk async for chunk in response.aiter_raw()])
+
+
+class TestCompressionMiddleware:
+    @pytest.mark.anyio
+    async def test_threshold_boundary(self, client: AsyncClient):
+        response, body = await get_raw(client, f"/sized?size={MINIMUM_SIZE - 1}")
+        assert "content-encoding" not in response.headers
+        assert body == b"x" * (MINIMUM_SIZE - 1)
+
+        response, body = await get_raw(client, f"/sized?size={MINIMUM_SIZE}")
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-length"] == str(len(body))
+        assert gzip.decompress(body) == b"x" * MINIMUM_SIZE
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("accept_encoding, expected", [
+        ("gzip", "gzip"),
+        pytest.param("br", "br", marks=requires_brotli),
+        pytest.param("gzip, deflate, br", "br", marks=requires_brotli),
+        ("br;q=0, gzip", "gzip"),
+        ("deflate", None),
+        ("identity", None),
+    ])
+    async def test_negotiation(self, client: AsyncClient, accept_encoding, expected):
+        response, body = await get_raw(client, "/sized?size=500", accept_encoding)
+
+        assert response.headers.get("content-encoding") == expected
+        decompress = {"gzip": gzip.decompress, "br": brotli and brotli.decompress, None: bytes}[expected]
+        assert decompress(body) == b"x" * 500
+
+    @pytest.mark.anyio
+    async def test_vary_accept_encoding(self, client: AsyncClient):
+        response, _ = await get_raw(client, "/sized?size=500")
+
+        assert "Accept-Encoding" in response.headers["vary"]
+
+    @pytest.mark.anyio
+    async def test_already_encoded_response_is_not_recompressed(self, client: AsyncClient):
+        response, body = await get_raw(client, "/encoded", "br, gzip")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body) == b"y" * 500
+
+    @pytest.mark.anyio
+    async def test_streamed_response_is_compressed_chunk_by_chunk(self, client: AsyncClient):
+        response, body = await get_raw(client, "/streamed")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(body).decode() == "".join(f"row {index}\n" * 10 for index in range(3))
+
+    @pytest.mark.anyio
+    async def test_event_streams_and_excluded_paths_are_passed_through(self, client: AsyncClient):
+        response, body = await get_raw(client, "/events")
+        assert "content-encoding" not in response.headers
+        assert body == b"data: x\n\n" * 50
+
+        response, body = await get_raw(client, "/excluded/path")
+        assert "content-encoding" not in response.headers
+        assert body == b"z" * 500
+
+
+class TestCompressedExport:
+    @pytest.mark.anyio
+    async def test_csv_export_is_streamed_compressed(self, api_client: AsyncClient):
+        for index in range(50):
+            await Alert(
+                alert_id=f"alert-{index}", message=f"Flooding in district {index}", location="Germany",
+                related_request_id=None, meta={}, fingerprint=f"fingerprint-{index}",
+            ).create()
+
+        response = await api_client.get(
+            "/alerts/export", params={"format": "csv"}, headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 50
+        assert rows[0]["message"].startswith("Flooding in district")
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import models
+from config.config import find_duplicate_keys
+from services.alert_chat_service import merge_duplicate_chats
+
+
+class TestDuplicateCleanup:
+    @pytest.mark.anyio
+    async def test_find_duplicate_keys(self):
+        database = AsyncMongoMockClient()["database_name"]
+        await database["users"].insert_many([
+            {"wallet_address": "wallet-1"}, {"wallet_address": "wallet-1"}, {"wallet_address": "wallet-2"},
+        ])
+        await database["alerts"].insert_many([
+            # Fingerprints are only unique when set
+            {"alert_id": "a1", "fingerprint": None}, {"alert_id": "a2", "fingerprint": None},
+        ])
+        await database["alert_chats"].insert_many([
+            {"alert_id": "a1", "user_id": "u1"}, {"alert_id": "a1", "user_id": "u1"}, {"alert_id": "a1", "user_id": "u2"},
+        ])
+
+        report = await find_duplicate_keys(database, models.__all__)
+
+        assert report == {
+            "users.wallet_address_1": [{"wallet_address": "wallet-1"}],
+            "alert_chats.alert_id_1_user_id_1": [{"alert_id": "a1", "user_id": "u1"}],
+        }
+
+    @pytest.mark.anyio
+    async def test_merge_duplicate_chats(self):
+        database = AsyncMongoMockClient()["database_name"]
+        collection = database["alert_chats"]
+        await collection.insert_many([
+            {
+                "alert_id": "a1", "user_id": "u1",
+                "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 3),
+                "messages": [{"sender": "user", "message": "third", "timestamp": datetime(2024, 1, 3)}],
+            },
+            {
+                "alert_id": "a1", "user_id": "u1",
+                "created_at": datetime(2024, 1, 2), "updated_at": datetime(2024, 1, 2),
+                "messages": [{"sender": "ai", "message": "second", "timestamp": datetime(2024, 1, 2)}],
+            },
+            {"alert_id": "a1", "user_id": "u2", "created_at": datetime(2024, 1, 1), "messages": []},
+        ])
+
+        assert await merge_duplicate_chats(database) == 1
+
+        chat = await collection.find_one({"alert_id": "a1", "user_id": "u1"})
+        assert [message["message"] for message in chat["messages"]] == ["second", "third"]
+        assert chat["updated_at"] == datetime(2024, 1, 3)
+        assert chat["message_count"] == 0
+        assert await collection.count_documents({}) == 2
+        assert await merge_duplicate_chats(database) == 0
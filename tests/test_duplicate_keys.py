@@ -0,0 +1,40 @@
+import pytest
+from httpx import AsyncClient
+
+from models.donation import Donation
+
+USER = {"fullname": "Ada", "email": "ada@example.com", "wallet_address": "wallet-1"}
+ALERT = {"alert_id": "alert-1", "message": "Flooding", "location": "global", "related_request_id": None, "meta": {}}
+DONATION = {"donor_wallet": "wallet-1", "tx_signature": "tx-1", "amount": 1.5, "currency": "SOL"}
+
+
+class TestDuplicateKeys:
+    @pytest.mark.anyio
+    async def test_second_user_with_the_same_wallet(self, api_client: AsyncClient):
+        assert (await api_client.post("/users/", json=USER)).status_code == 200
+
+        response = await api_client.post("/users/", json={**USER, "email": "other@example.com"})
+        assert response.status_code == 409
+
+    @pytest.mark.anyio
+    async def test_user_update_to_a_taken_wallet(self, api_client: AsyncClient):
+        await api_client.post("/users/", json=USER)
+        other = (await api_client.post("/users/", json={**USER, "wallet_address": "wallet-2"})).json()["data"]
+
+        response = await api_client.put(f"/users/{other['_id']}", json={"fullname": None, "email": None, "wallet_address": "wallet-1"})
+        assert response.status_code == 409
+
+    @pytest.mark.anyio
+    async def test_reused_alert_id(self, api_client: AsyncClient):
+        assert (await api_client.post("/alerts/", json=ALERT)).status_code == 200
+
+        response = await api_client.post("/alerts/", json={**ALERT, "message": "Another alert"})
+        assert response.status_code == 409
+
+    @pytest.mark.anyio
+    async def test_resubmitted_donation(self, api_client: AsyncClient):
+        assert (await api_client.post("/donations/transaction", json=DONATION)).status_code == 200
+
+        response = await api_client.post("/donations/transaction", json=DONATION)
+        assert response.status_code == 409
+        assert await Donation.find_all().count() == 1
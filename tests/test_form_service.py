@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import ASCENDING
+
+from services.form_service import merge_duplicate_forms
+
+
+class TestMergeDuplicateForms:
+    @pytest.mark.anyio
+    async def test_merges_duplicates_and_replaces_the_old_index(self):
+        collection = AsyncMongoMockClient()["database_name"]["forms"]
+        await collection.create_index([("alert_id", ASCENDING)], name="alert_id_1")
+        await collection.insert_many([
+            {
+                "alert_id": "a1",
+                "created_at": datetime(2024, 1, 1),
+                "updated_at": datetime(2024, 1, 3),
+                "messages": [{"user_id": "u1", "content": "third", "timestamp": datetime(2024, 1, 3)}],
+            },
+            {
+                "alert_id": "a1",
+                "created_at": datetime(2024, 1, 2),
+                "updated_at": datetime(2024, 1, 2),
+                "messages": [{"user_id": "u2", "content": "second", "timestamp": datetime(2024, 1, 2)}],
+            },
+            {"alert_id": "a2", "created_at": datetime(2024, 1, 1), "messages": []},
+        ])
+
+        assert await merge_duplicate_forms(collection.database) == 1
+
+        form = await collection.find_one({"alert_id": "a1"})
+        assert [message["content"] for message in form["messages"]] == ["second", "third"]
+        assert form["updated_at"] == datetime(2024, 1, 3)
+        indexes = await collection.index_information()
+        assert "alert_id_1" not in indexes
+        assert indexes["alert_id_unique"]["unique"] is True
+
+        # Safe to run again once the unique index exists
+        assert await merge_duplicate_forms(collection.database) == 0
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+from fastapi import Request, Response
+from httpx import AsyncClient
+
+from models.form import Form, Message
+from services.http_cache import conditional, http_date, version_etag
+
+LAST_MODIFIED = datetime(2024, 6, 1, 12, 30, 15, 123456)
+
+
+def make_request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+class TestConditional:
+    def test_sets_validators_without_conditional_headers(self):
+        response = Response()
+        etag = version_etag("doc", 1)
+
+        assert conditional(make_request(), response, etag, last_modified=LAST_MODIFIED) is None
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.headers["last-modified"] == "Sat, 01 Jun 2024 12:30:15 GMT"
+
+    def test_matching_etag(self):
+        etag = version_etag("doc", 1)
+
+        not_modified = conditional(make_request(if_none_match=etag), Response(), etag)
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+        assert conditional(make_request(if_none_match=f"W/{etag}"), Response(), etag).status_code == 304
+        assert conditional(make_request(if_none_match="*"), Response(), etag).status_code == 304
+
+    def test_stale_etag(self):
+        request = make_request(if_none_match=version_etag("doc", 1))
+
+        assert conditional(request, Response(), version_etag("doc", 2)) is None
+
+    def test_if_none_match_wins_over_if_modified_since(self):
+        request = make_request(
+            if_none_match=version_etag("doc", 1), if_modified_since=http_date(LAST_MODIFIED)
+        )
+
+        assert conditional(request, Response(), version_etag("doc", 2), last_modified=LAST_MODIFIED) is None
+
+    @pytest.mark.parametrize("if_modified_since", [
+        "Sat, 01 Jun 2024 12:30:15 GMT",
+        "Sat, 01 Jun 2024 12:30:15 -0000",
+        "Sat, 01 Jun 2024 14:30:15 +0200",
+        "Sun, 02 Jun 2024 00:00:00 GMT",
+    ])
+    def test_if_modified_since_not_modified(self, if_modified_since):
+        request = make_request(if_modified_since=if_modified_since)
+
+        not_modified = conditional(request, Response(), version_etag("doc", 1), last_modified=LAST_MODIFIED)
+        assert not_modified.status_code == 304
+
+    @pytest.mark.parametrize("if_modified_since", [
+        "Sat, 01 Jun 2024 12:30:14 GMT",
+        "Sat, 01 Jun 2024 12:30:14 -0000",
+        "not a date",
+        "Sat, 01 Jun 2024",
+        "",
+    ])
+    def test_if_modified_since_modified_or_malformed(self, if_modified_since):
+        request = make_request(if_modified_since=if_modified_since)
+
+        assert conditional(request, Response(), version_etag("doc", 1), last_modified=LAST_MODIFIED) is None
+
+    def test_if_modified_since_without_last_modified(self):
+        request = make_request(if_modified_since=http_date(LAST_MODIFIED))
+
+        assert conditional(request, Response(), version_etag("doc", 1)) is None
+
+
+class TestConditionalRoutes:
+    @pytest.mark.anyio
+    async def test_form_etag_and_if_modified_since(self, api_client: AsyncClient):
+        await Form.append_message("alert-1", Message(user_id="u1", content="hello"))
+
+        response = await api_client.get("/forms/alert/alert-1")
+        assert response.status_code == 200
+        etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+        response = await api_client.get("/forms/alert/alert-1", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        odd_zone = last_modified.replace("GMT", "-0000")
+        for value in (last_modified, odd_zone):
+            response = await api_client.get("/forms/alert/alert-1", headers={"If-Modified-Since": value})
+            assert response.status_code == 304
+
+        response = await api_client.get("/forms/alert/alert-1", headers={"If-Modified-Since": "garbage"})
+        assert response.status_code == 200
+
+        await Form.append_message("alert-1", Message(user_id="u2", content="again"))
+        response = await api_client.get("/forms/alert/alert-1", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()["data"]["messages"]) == 2
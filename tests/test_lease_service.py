@@ -0,0 +1,59 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from models.lease import Lease
+from services.lease_service import acquire_lease, new_lease_owner, release_lease
+
+TTL = timedelta(minutes=5)
+
+
+class TestLease:
+    @pytest.mark.anyio
+    async def test_acquire_free_lease(self, database):
+        owner = new_lease_owner()
+
+        assert await acquire_lease("alerts:Berlin", owner, TTL) is True
+        lease = await Lease.find_one(Lease.key == "alerts:Berlin")
+        assert lease.owner == owner
+
+    @pytest.mark.anyio
+    async def test_rejects_other_owner_while_held(self, database):
+        holder, other = new_lease_owner(), new_lease_owner()
+
+        assert await acquire_lease("alerts:Berlin", holder, TTL) is True
+        assert await acquire_lease("alerts:Berlin", other, TTL) is False
+        assert (await Lease.find_one(Lease.key == "alerts:Berlin")).owner == holder
+        # Other keys are independent
+        assert await acquire_lease("alerts:Paris", other, TTL) is True
+
+    @pytest.mark.anyio
+    async def test_owner_renews(self, database):
+        owner = new_lease_owner()
+        await acquire_lease("alerts:Berlin", owner, timedelta(seconds=1))
+        first_expiry = (await Lease.find_one(Lease.key == "alerts:Berlin")).expires_at
+
+        assert await acquire_lease("alerts:Berlin", owner, TTL) is True
+        assert (await Lease.find_one(Lease.key == "alerts:Berlin")).expires_at > first_expiry
+        assert await Lease.find_all().count() == 1
+
+    @pytest.mark.anyio
+    async def test_expired_lease_can_be_taken_over(self, database):
+        holder, other = new_lease_owner(), new_lease_owner()
+        await acquire_lease("alerts:Berlin", holder, timedelta(milliseconds=1))
+        await asyncio.sleep(0.01)
+
+        assert await acquire_lease("alerts:Berlin", other, TTL) is True
+        assert (await Lease.find_one(Lease.key == "alerts:Berlin")).owner == other
+
+    @pytest.mark.anyio
+    async def test_only_the_owner_releases(self, database):
+        holder, other = new_lease_owner(), new_lease_owner()
+        await acquire_lease("alerts:Berlin", holder, TTL)
+
+        await release_lease("alerts:Berlin", other)
+        assert await acquire_lease("alerts:Berlin", other, TTL) is False
+
+        await release_lease("alerts:Berlin", holder)
+        assert await acquire_lease("alerts:Berlin", other, TTL) is True
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from httpx import AsyncClient
+
+from models.charity import Charity
+from models.form import ForumParticipation
+from services.pagination import decode_cursor, encode_cursor, paginate
+
+START = datetime(2024, 6, 1)
+
+
+async def create_charities(count: int) -> list:
+    charities = []
+    for index in range(count):
+        charities.append(await Charity(
+            name=f"charity {index}", description=None, location="Berlin", contact_info=None,
+            website=None, alert_id="alert-1", wallet_address="wallet", version=index % 2,
+        ).create())
+    return charities
+
+
+async def create_participation(user_id: str, alert_id: str, last_posted_at: datetime) -> ForumParticipation:
+    return await ForumParticipation(
+        user_id=user_id, alert_id=alert_id, first_posted_at=START, last_posted_at=last_posted_at,
+    ).create()
+
+
+class TestCursor:
+    @pytest.mark.parametrize("sort_value", [
+        None, START, 7, 0, 2.5, True, "Berlin", "42", ObjectId("65a000000000000000000001"),
+    ])
+    def test_round_trip_keeps_the_type(self, sort_value):
+        doc_id = ObjectId()
+
+        decoded_value, decoded_id = decode_cursor(encode_cursor(sort_value, doc_id))
+        assert decoded_value == sort_value
+        assert type(decoded_value) is type(sort_value) or isinstance(sort_value, ObjectId)
+        assert decoded_id == doc_id
+
+    @pytest.mark.parametrize("cursor", ["garbage", "", "eyJzIjp7fX0", encode_cursor(1, ObjectId())[:-4]])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValueError, match="Invalid pagination cursor."):
+            decode_cursor(cursor)
+
+
+class TestPaginate:
+    @pytest.mark.anyio
+    async def test_first_page_and_continuation(self, database):
+        charities = await create_charities(5)
+
+        page, next_cursor = await paginate(Charity, limit=2)
+        assert [c.id for c in page] == [c.id for c in charities[:2]]
+        assert next_cursor
+
+        page, next_cursor = await paginate(Charity, limit=2, after=next_cursor)
+        assert [c.id for c in page] == [c.id for c in charities[2:4]]
+
+        page, next_cursor = await paginate(Charity, limit=2, after=next_cursor)
+        assert [c.id for c in page] == [charities[4].id]
+        assert next_cursor is None
+
+    @pytest.mark.anyio
+    async def test_ties_on_the_sort_key(self, database):
+        # Three rows share a timestamp, a page boundary falls between them
+        rows = [
+            await create_participation("u1", f"alert-{index}", last_posted_at)
+            for index, last_posted_at in enumerate([START, START, START, START - timedelta(days=1)])
+        ]
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await paginate(
+                ForumParticipation, {"user_id": "u1"}, limit=2, after=cursor,
+                sort_field="last_posted_at", descending=True,
+            )
+            seen.extend(row.id for row in page)
+            if cursor is None:
+                break
+        assert sorted(seen[:3]) == sorted(row.id for row in rows[:3])
+        assert seen[3] == rows[3].id
+        assert len(set(seen)) == 4
+
+    @pytest.mark.anyio
+    async def test_int_sort_key(self, database):
+        charities = await create_charities(5)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await paginate(Charity, limit=2, after=cursor, sort_field="version")
+            seen.extend(charity.id for charity in page)
+            if cursor is None:
+                break
+        expected = [c.id for c in charities if c.version == 0] + [c.id for c in charities if c.version == 1]
+        assert seen == expected
+
+    @pytest.mark.anyio
+    async def test_projection_leaves_out_the_sort_key(self, database):
+        await create_participation("u1", "alert-1", START)
+        await create_participation("u1", "alert-2", START + timedelta(hours=1))
+
+        page, next_cursor = await paginate(
+            ForumParticipation, {"user_id": "u1"}, limit=1, fields="alert_id",
+            sort_field="last_posted_at", descending=True,
+        )
+        assert page == [{"_id": page[0]["_id"], "alert_id": "alert-2"}]
+
+        page, _ = await paginate(
+            ForumParticipation, {"user_id": "u1"}, limit=1, after=next_cursor, fields="alert_id,last_posted_at",
+            sort_field="last_posted_at", descending=True,
+        )
+        assert page[0]["alert_id"] == "alert-1"
+        assert page[0]["last_posted_at"] == START
+
+    @pytest.mark.anyio
+    async def test_unknown_field(self, database):
+        with pytest.raises(ValueError, match="Unknown fields: nope"):
+            await paginate(Charity, fields="name,nope")
+
+
+class TestPaginatedRoutes:
+    @pytest.mark.anyio
+    async def test_next_cursor_continues_the_listing(self, api_client: AsyncClient):
+        charities = await create_charities(3)
+
+        first = (await api_client.get("/charities/", params={"limit": 2})).json()
+        second = (await api_client.get("/charities/", params={"limit": 2, "after": first["next_cursor"]})).json()
+        assert [c["_id"] for c in first["data"] + second["data"]] == [str(c.id) for c in charities]
+        assert second["next_cursor"] is None
+
+    @pytest.mark.anyio
+    async def test_invalid_cursor_is_a_bad_request(self, api_client: AsyncClient):
+        response = await api_client.get("/charities/", params={"after": "garbage"})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid pagination cursor."
@@ -0,0 +1,165 @@
+from datetime import datetime
+
+import pytest
+
+from models.charity import Charity
+from models.donation import Donation, DonationRollup
+from services import donation_service
+from services.rollup_service import rebuild_rollups, record_donation, remove_donation, replace_donation
+
+DAY = datetime(2024, 6, 1, 12)
+
+
+async def create_charity(alert_id: str) -> Charity:
+    return await Charity(
+        name="Red Cross", description=None, location="Berlin", contact_info=None,
+        website=None, alert_id=alert_id, wallet_address="charity-wallet",
+    ).create()
+
+
+async def update(donation: Donation, **fields) -> Donation:
+    # What update_donation does: write the new values, then move the contribution
+    previous = donation.model_copy()
+    await donation.update({"$set": fields})
+    await replace_donation(previous, donation)
+    return donation
+
+
+async def create_donation(tx_signature: str, **fields) -> Donation:
+    fields = {"amount": 2.0, "currency": "SOL", "status": "confirmed", "timestamp": DAY, **fields}
+    return await Donation(donor_wallet="donor", tx_signature=tx_signature, **fields).create()
+
+
+async def rollups() -> dict:
+    rows = await DonationRollup.find_all().to_list()
+    return {
+        (row.dimension, row.key, row.currency): (row.total_amount, row.donation_count)
+        for row in rows
+        if row.donation_count
+    }
+
+
+class TestPendingDonations:
+    @pytest.mark.anyio
+    async def test_pending_donations_do_not_count(self, database):
+        await record_donation(await create_donation("tx-1", status="pending"))
+
+        assert await rollups() == {}
+        await create_donation("tx-2", status="pending")
+        assert await rebuild_rollups() == 0
+
+    @pytest.mark.anyio
+    async def test_reverify_moves_pending_donations_into_the_rollups(self, database, mocker):
+        mocker.patch.object(donation_service.settings, "solana_verify_transactions", True)
+        results = {"tx-ok": True, "tx-bad": False}
+
+        async def transaction_confirmed(tx_signature):
+            if tx_signature == "tx-down":
+                raise ConnectionError("RPC unreachable")
+            return results[tx_signature]
+
+        mocker.patch.object(donation_service.solana_rpc, "transaction_confirmed", side_effect=transaction_confirmed)
+        for tx_signature in ("tx-ok", "tx-bad", "tx-down"):
+            await record_donation(await create_donation(tx_signature, status="pending"))
+
+        counts = await donation_service.reverify_pending_donations()
+
+        assert counts == {"confirmed": 1, "failed": 1, "pending": 1}
+        statuses = {donation.tx_signature: donation.status for donation in await Donation.find_all().to_list()}
+        assert statuses == {"tx-ok": "confirmed", "tx-bad": "failed", "tx-down": "pending"}
+        assert (await rollups())[("currency", "SOL", "SOL")] == (2.0, 1)
+
+
+class TestIncrementalRollups:
+    @pytest.mark.anyio
+    async def test_record_donation(self, database):
+        charity = await create_charity("alert-1")
+        await record_donation(await create_donation("tx-1", charity_id=str(charity.id)))
+        await record_donation(await create_donation("tx-2", amount=3.0, charity_id=str(charity.id)))
+
+        assert await rollups() == {
+            ("currency", "SOL", "SOL"): (5.0, 2),
+            ("day", "2024-06-01", "SOL"): (5.0, 2),
+            ("charity", str(charity.id), "SOL"): (5.0, 2),
+            ("alert", "alert-1", "SOL"): (5.0, 2),
+        }
+
+    @pytest.mark.anyio
+    async def test_replace_amount_and_currency(self, database):
+        donation = await create_donation("tx-1")
+        await record_donation(donation)
+        await record_donation(await create_donation("tx-2"))
+
+        await update(donation, amount=10.0, currency="USDC")
+
+        assert await rollups() == {
+            ("currency", "SOL", "SOL"): (2.0, 1),
+            ("day", "2024-06-01", "SOL"): (2.0, 1),
+            ("currency", "USDC", "USDC"): (10.0, 1),
+            ("day", "2024-06-01", "USDC"): (10.0, 1),
+        }
+
+    @pytest.mark.anyio
+    async def test_replace_charity_moves_the_alert_total(self, database):
+        first, second = await create_charity("alert-1"), await create_charity("alert-2")
+        donation = await create_donation("tx-1", charity_id=str(first.id))
+        await record_donation(donation)
+
+        await update(donation, charity_id=str(second.id))
+
+        totals = await rollups()
+        assert ("charity", str(first.id), "SOL") not in totals
+        assert ("alert", "alert-1", "SOL") not in totals
+        assert totals[("charity", str(second.id), "SOL")] == (2.0, 1)
+        assert totals[("alert", "alert-2", "SOL")] == (2.0, 1)
+
+    @pytest.mark.anyio
+    async def test_replace_to_and_from_failed(self, database):
+        donation = await create_donation("tx-1")
+        await record_donation(donation)
+
+        await update(donation, status="failed")
+        assert await rollups() == {}
+
+        await update(donation, status="confirmed")
+        assert await rollups() == {
+            ("currency", "SOL", "SOL"): (2.0, 1),
+            ("day", "2024-06-01", "SOL"): (2.0, 1),
+        }
+
+    @pytest.mark.anyio
+    async def test_remove_donation(self, database):
+        kept, removed = await create_donation("tx-1"), await create_donation("tx-2", amount=5.0)
+        await record_donation(kept)
+        await record_donation(removed)
+
+        await removed.delete()
+        await remove_donation(removed)
+
+        assert await rollups() == {
+            ("currency", "SOL", "SOL"): (2.0, 1),
+            ("day", "2024-06-01", "SOL"): (2.0, 1),
+        }
+
+    @pytest.mark.anyio
+    async def test_rebuild_matches_the_incremental_rollups(self, database):
+        first, second = await create_charity("alert-1"), await create_charity("alert-2")
+        donations = [
+            await create_donation("tx-1", charity_id=str(first.id)),
+            await create_donation("tx-2", amount=4.0, currency="USDC", charity_id=str(second.id)),
+            await create_donation("tx-3", amount=1.5, timestamp=datetime(2024, 6, 2, 8)),
+            await create_donation("tx-4", amount=7.0, charity_id=str(first.id)),
+            await create_donation("tx-5", amount=9.0, status="failed", charity_id=str(first.id)),
+        ]
+        for donation in donations:
+            await record_donation(donation)
+        await update(donations[0], amount=3.0, charity_id=str(second.id))
+        await update(donations[4], status="confirmed")
+        await update(donations[3], status="failed")
+        await donations[2].delete()
+        await remove_donation(donations[2])
+        incremental = await rollups()
+
+        await rebuild_rollups()
+
+        assert await rollups() == incremental
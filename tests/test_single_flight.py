@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.anyio
+    async def test_collapses_concurrent_callers(self):
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return calls
+
+        waiters = [asyncio.create_task(flight.do("alerts:Berlin", load)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flight.in_flight("alerts:Berlin")
+        release.set()
+
+        assert await asyncio.gather(*waiters) == [1] * 5
+        assert calls == 1
+        assert not flight.in_flight("alerts:Berlin")
+
+        # Once finished, the next call runs again
+        assert await flight.do("alerts:Berlin", load) == 2
+
+    @pytest.mark.anyio
+    async def test_keys_run_independently(self):
+        flight = SingleFlight()
+
+        async def load(value):
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(
+            flight.do("a", lambda: load("a")), flight.do("b", lambda: load("b"))
+        )
+        assert results == ["a", "b"]
+
+    @pytest.mark.anyio
+    async def test_propagates_errors_to_every_caller(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def fail():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            raise RuntimeError("Gemini unavailable")
+
+        results = await asyncio.gather(
+            *(flight.do("alerts:Berlin", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert not flight.in_flight("alerts:Berlin")
+
+    @pytest.mark.anyio
+    async def test_cancelled_caller_does_not_cancel_the_others(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("alerts:Berlin", load))
+        second = asyncio.create_task(flight.do("alerts:Berlin", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
@@ -0,0 +1,69 @@
+import httpx
+import pytest
+from solana.exceptions import SolanaRpcException
+
+from services.solana_client import SolanaRPC
+
+SIGNATURE = "5" * 88
+CONFIRMED = {
+    "jsonrpc": "2.0",
+    "id": 0,
+    "result": {
+        "context": {"slot": 1},
+        "value": [{
+            "slot": 1, "confirmations": None, "err": None,
+            "status": {"Ok": None}, "confirmationStatus": "finalized",
+        }],
+    },
+}
+
+
+def stub_rpc(*responses) -> tuple:
+    """
+    SolanaRPC whose HTTP session answers with the given responses in turn,
+    repeating the last one. Exceptions among them are raised instead.
+    """
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        response = responses[min(len(requests), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    rpc = SolanaRPC("http://rpc.test", timeout=1, max_retries=3, backoff=0)
+    rpc.client._provider.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return rpc, requests
+
+
+class TestSolanaRPC:
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("failure", [
+        httpx.Response(429),
+        httpx.Response(503),
+        httpx.ConnectError("Connection refused"),
+        httpx.ReadTimeout("Timed out"),
+    ])
+    async def test_transient_failures_are_retried(self, failure):
+        rpc, requests = stub_rpc(failure, failure, httpx.Response(200, json=CONFIRMED))
+
+        assert await rpc.transaction_confirmed(SIGNATURE) is True
+        assert len(requests) == 3
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("status_code", [400, 401, 403, 404])
+    async def test_client_errors_are_not_retried(self, status_code):
+        rpc, requests = stub_rpc(httpx.Response(status_code), httpx.Response(200, json=CONFIRMED))
+
+        with pytest.raises(SolanaRpcException):
+            await rpc.transaction_confirmed(SIGNATURE)
+        assert len(requests) == 1
+
+    @pytest.mark.anyio
+    async def test_gives_up_after_max_retries(self):
+        rpc, requests = stub_rpc(httpx.Response(502))
+
+        with pytest.raises(SolanaRpcException):
+            await rpc.transaction_confirmed(SIGNATURE)
+        assert len(requests) == 4